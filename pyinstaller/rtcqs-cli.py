@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+
+from rtcqs.rtcqs import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+
+from rtcqs.rtcqs_gui import main
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,12 @@
-from rtcqs.resources import Resources
-from rtcqs.rtcqs import Rtcqs
+__all__ = ["Rtcqs", "Resources"]
+
+
+def __getattr__(name):
+    if name == "Rtcqs":
+        from rtcqs.rtcqs import Rtcqs
+        return Rtcqs
+    elif name == "Resources":
+        from rtcqs.resources import Resources
+        return Resources
+
+    raise AttributeError(f"module 'rtcqs' has no attribute {name!r}")
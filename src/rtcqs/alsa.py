@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+import re
+
+ASOUND_DIR = "/proc/asound"
+CARD_RE = re.compile(r"\s*(\d+) \[(.*?)\s*\]: (\S+) - (.*)")
+IRQ_RE = re.compile(r"\birq (\d+)")
+USB_RE = re.compile(r"\busb-([0-9a-f]{4}:[0-9a-f]{2}:[0-9a-f]{2}\.[0-9a-f])")
+DIRECTIONS = {"p": "playback", "c": "capture"}
+
+
+class Card:
+    __slots__ = ("number", "id", "driver", "name", "longname")
+
+    def __init__(self, number, id, driver, name, longname=""):
+        self.number = number
+        self.id = id
+        self.driver = driver
+        self.name = name
+        self.longname = longname
+
+    @property
+    def irq(self):
+        match = IRQ_RE.search(self.longname)
+        return int(match.group(1)) if match else None
+
+    @property
+    def usb_controller(self):
+        match = USB_RE.search(self.longname)
+        return match.group(1) if match else None
+
+
+class Stream:
+    __slots__ = ("card", "device", "subdevice", "direction", "name", "state",
+                 "owner_pid", "format", "channels", "rate", "period_size",
+                 "buffer_size", "avail_min")
+
+    def __init__(self, card, device, subdevice, direction, hw_params,
+                 sw_params=None, status=None, info=None):
+        sw_params = sw_params or {}
+        status = status or {}
+        self.card = card
+        self.device = device
+        self.subdevice = subdevice
+        self.direction = direction
+        self.name = (info or {}).get("name")
+        self.state = status.get("state")
+        self.owner_pid = int(status["owner_pid"]) \
+            if status.get("owner_pid", "").isdigit() else None
+        self.format = hw_params.get("format")
+        self.channels = int(hw_params.get("channels", 0))
+        self.rate = int(hw_params.get("rate", "0").split()[0])
+        self.period_size = int(hw_params.get("period_size", 0))
+        self.buffer_size = int(hw_params.get("buffer_size", 0))
+        self.avail_min = int(sw_params["avail_min"]) \
+            if sw_params.get("avail_min", "").isdigit() else None
+
+    @property
+    def periods(self):
+        return self.buffer_size // self.period_size if self.period_size else 0
+
+    @property
+    def period_us(self):
+        return self.period_size * 1000000 / self.rate if self.rate else 0
+
+    def as_dict(self):
+        return {
+            "card": self.card.number,
+            "device": self.device,
+            "subdevice": self.subdevice,
+            "direction": self.direction,
+            "name": self.name,
+            "state": self.state,
+            "owner_pid": self.owner_pid,
+            "format": self.format,
+            "channels": self.channels,
+            "rate": self.rate,
+            "period_size": self.period_size,
+            "periods": self.periods,
+            "avail_min": self.avail_min,
+            "period_us": round(self.period_us),
+        }
+
+
+def parse_cards(text):
+    cards = []
+
+    for line in text.splitlines():
+        match = CARD_RE.match(line)
+
+        if match:
+            number, id, driver, name = match.groups()
+            cards.append(Card(int(number), id, driver, name))
+        elif cards and line.strip():
+            cards[-1].longname = line.strip()
+
+    return cards
+
+
+def parse_params(text):
+    params = {}
+
+    for line in text.splitlines():
+        key, sep, value = line.partition(":")
+
+        if sep:
+            params[key.strip()] = value.strip()
+
+    return params
+
+
+def read_cards(sysroot):
+    try:
+        with sysroot.open(f"{ASOUND_DIR}/cards", "r") as f:
+            return parse_cards(f.read())
+    except OSError:
+        return []
+
+
+def read_params(sysroot, path):
+    try:
+        with sysroot.open(path, "r") as f:
+            text = f.read()
+    except OSError:
+        return None
+
+    if text.startswith(("closed", "no setup")):
+        return None
+
+    return parse_params(text)
+
+
+def read_streams(sysroot, cards):
+    streams = []
+
+    for card in cards:
+        card_dir = f"{ASOUND_DIR}/card{card.number}"
+
+        try:
+            pcms = sorted(
+                entry for entry in sysroot.listdir(card_dir)
+                if re.fullmatch("pcm[0-9]+[pc]", entry))
+        except OSError:
+            continue
+
+        for pcm in pcms:
+            try:
+                subs = sorted(
+                    entry for entry in sysroot.listdir(f"{card_dir}/{pcm}")
+                    if re.fullmatch("sub[0-9]+", entry))
+            except OSError:
+                continue
+
+            for sub in subs:
+                sub_dir = f"{card_dir}/{pcm}/{sub}"
+                hw_params = read_params(sysroot, f"{sub_dir}/hw_params")
+
+                if hw_params is None:
+                    continue
+
+                stream = Stream(
+                    card, int(pcm[3:-1]), int(sub[3:]), DIRECTIONS[pcm[-1]],
+                    hw_params, read_params(sysroot, f"{sub_dir}/sw_params"),
+                    read_params(sysroot, f"{sub_dir}/status"),
+                    read_params(sysroot, f"{sub_dir}/info"))
+
+                if stream.rate and stream.period_size:
+                    streams.append(stream)
+
+    return streams
+
+
+def card_irqs(sysroot, card, inventory=None):
+    if card.irq is not None:
+        return [card.irq]
+
+    if card.usb_controller is not None:
+        device_dir = f"/sys/bus/pci/devices/{card.usb_controller}"
+
+        try:
+            return sorted(
+                int(irq) for irq in sysroot.listdir(f"{device_dir}/msi_irqs"))
+        except OSError:
+            irq = sysroot.read_line(f"{device_dir}/irq")
+
+            if irq and irq != "0":
+                return [int(irq)]
+
+    if inventory is not None:
+        action = f":card{card.number}"
+
+        return [
+            irq.irq for irq in inventory.sound()
+            if any(name.endswith(action) for name in irq.actions)]
+
+    return []
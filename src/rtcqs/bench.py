@@ -0,0 +1,630 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import errno
+import json
+import time
+import mmap
+import array
+import ctypes
+import resource
+import random
+import struct
+import tempfile
+import contextlib
+from rtcqs.clocks import measure_clocks
+from rtcqs.irqs import sample_rates
+from rtcqs.mounts import read_mounts
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self, buckets=10000):
+        self.counts = array.array("Q", bytes(8 * (buckets + 1)))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def add(self, latency_ns):
+        latency_us = latency_ns // 1000
+        self.counts[min(latency_us, len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total += latency_ns
+
+        if self.min is None or latency_ns < self.min:
+            self.min = latency_ns
+
+        if latency_ns > self.max:
+            self.max = latency_ns
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+
+        target = self.count * percent / 100
+        seen = 0
+
+        for latency_us, count in enumerate(self.counts):
+            seen += count
+
+            if seen >= target:
+                return latency_us
+
+        return len(self.counts) - 1
+
+    def summary(self):
+        return {
+            "samples": self.count,
+            "min": self.min // 1000 if self.count else None,
+            "avg": self.total // self.count // 1000 if self.count else None,
+            "p99": self.percentile(99),
+            "p99.99": self.percentile(99.99),
+            "max": self.max // 1000 if self.count else None,
+            "overflow": self.counts[-1],
+        }
+
+
+class Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+def absolute_sleeper():
+    try:
+        clock_nanosleep = ctypes.CDLL(None).clock_nanosleep
+    except AttributeError:
+        def sleep_until(deadline_ns):
+            delay = deadline_ns - time.monotonic_ns()
+
+            if delay > 0:
+                time.sleep(delay / 1e9)
+
+        return sleep_until
+
+    timer_abstime = 1
+    request = Timespec()
+    pointer = ctypes.byref(request)
+
+    def sleep_until(deadline_ns):
+        request.tv_sec, request.tv_nsec = divmod(deadline_ns, 1000000000)
+
+        while clock_nanosleep(
+                time.CLOCK_MONOTONIC, timer_abstime, pointer, None) == \
+                errno.EINTR:
+            pass
+
+    return sleep_until
+
+
+def measure_latency(cpu, period_ns, duration, priority):
+    histogram = LatencyHistogram()
+    error = None
+    os.sched_setaffinity(0, {cpu})
+
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except PermissionError as e:
+        error = str(e)
+
+    clock = time.monotonic_ns
+    sleep_until = absolute_sleeper()
+    add = histogram.add
+    start = clock() + period_ns
+
+    for period in range(int(duration * 1e9) // period_ns):
+        deadline = start + period * period_ns
+        sleep_until(deadline)
+        add(max(clock() - deadline, 0))
+
+    return cpu, histogram, error
+
+
+def measure_worker(conn, cpu, period_ns, duration, priority):
+    try:
+        conn.send((None, measure_latency(cpu, period_ns, duration, priority)))
+    except Exception as e:
+        conn.send((f"{type(e).__name__}: {e}", None))
+    finally:
+        conn.close()
+
+
+def measure_cpus(cpus, period_ns, duration, priority):
+    import multiprocessing
+
+    workers = []
+    results = {}
+    failures = []
+
+    for cpu in cpus:
+        conn, child_conn = multiprocessing.Pipe(duplex=False)
+        worker = multiprocessing.Process(
+            target=measure_worker,
+            args=(child_conn, cpu, period_ns, duration, priority))
+        worker.start()
+        child_conn.close()
+        workers.append((cpu, worker, conn))
+
+    for cpu, worker, conn in workers:
+        try:
+            failure, result = conn.recv()
+        except EOFError:
+            failure, result = None, None
+
+        worker.join()
+        conn.close()
+
+        if result is None:
+            failures.append(
+                f"CPU {cpu}: {failure or f'exit status {worker.exitcode}'}")
+        else:
+            _, histogram, error = result
+            results[cpu] = (histogram, error)
+
+    if failures:
+        raise RuntimeError(
+            f"latency measurement failed on {', '.join(failures)}")
+
+    return results
+
+
+def run_latency(cpus=None, frames=64, rate=48000, duration=10.0,
+                priority=80, output_format="text", histogram_path=None):
+    cpus = sorted(cpus or os.sched_getaffinity(0))
+    period_ns = frames * 1000000000 // rate
+    results = measure_cpus(cpus, period_ns, duration, priority)
+
+    if output_format == "text":
+        print(f"Period: {frames} frames at {rate} Hz "
+              f"({period_ns / 1000:.0f} us)")
+        print(f"{'CPU':>5} {'samples':>9} {'min':>7} {'avg':>7} {'p99':>7} "
+              f"{'p99.99':>7} {'max':>7}")
+
+        for cpu, (histogram, error) in results.items():
+            summary = histogram.summary()
+
+            if not summary["samples"]:
+                print(f"{cpu:>5} no samples")
+            else:
+                print(f"{cpu:>5} {summary['samples']:>9} "
+                      f"{summary['min']:>7} {summary['avg']:>7} "
+                      f"{summary['p99']:>7} {summary['p99.99']:>7} "
+                      f"{summary['max']:>7}")
+
+            if error:
+                print(f"      not SCHED_FIFO: {error}", file=sys.stderr)
+
+        print("All latencies in microseconds.")
+    else:
+        print(json.dumps({
+            "period_us": period_ns // 1000,
+            "cpus": {
+                str(cpu): dict(histogram.summary(), error=error)
+                for cpu, (histogram, error) in results.items()}}))
+
+    if histogram_path:
+        write_histogram(histogram_path, results)
+
+    return results
+
+
+@contextlib.contextmanager
+def hold_cpu_dma_latency(latency_us=0):
+    with open("/dev/cpu_dma_latency", "wb", buffering=0) as f:
+        f.write(struct.pack("i", latency_us))
+        yield
+
+
+def run_cstates(cpus=None, frames=64, rate=48000, duration=10.0,
+                priority=80, output_format="text"):
+    cpus = sorted(cpus or os.sched_getaffinity(0))
+    period_ns = frames * 1000000000 // rate
+    free = measure_cpus(cpus, period_ns, duration / 2, priority)
+
+    try:
+        with hold_cpu_dma_latency(0):
+            held = measure_cpus(cpus, period_ns, duration / 2, priority)
+    except OSError as e:
+        print(f"rtcqs: can't hold /dev/cpu_dma_latency: {e}", file=sys.stderr)
+        return None
+
+    if output_format == "text":
+        print(f"Period: {frames} frames at {rate} Hz "
+              f"({period_ns / 1000:.0f} us)")
+        print(f"{'CPU':>5} {'p99':>7} {'max':>7} {'p99 held':>9} "
+              f"{'max held':>9}")
+
+        for cpu in cpus:
+            summary = free[cpu][0].summary()
+            held_summary = held[cpu][0].summary()
+
+            if not summary["samples"] or not held_summary["samples"]:
+                print(f"{cpu:>5} no samples")
+            else:
+                print(f"{cpu:>5} {summary['p99']:>7} {summary['max']:>7} "
+                      f"{held_summary['p99']:>9} {held_summary['max']:>9}")
+
+        print("All latencies in microseconds, 'held' columns were measured "
+              "while holding a 0 us /dev/cpu_dma_latency request.")
+    else:
+        print(json.dumps({
+            "period_us": period_ns // 1000,
+            "cpus": {
+                str(cpu): {"free": free[cpu][0].summary(),
+                           "held": held[cpu][0].summary()}
+                for cpu in cpus}}))
+
+    return free, held
+
+
+def touch_pages(size, stall_ns=100000):
+    buffer = mmap.mmap(-1, size)
+    clock = time.perf_counter_ns
+    faults = resource.getrusage(resource.RUSAGE_SELF)
+    start = clock()
+    worst = stalls = 0
+
+    for offset in range(0, size, mmap.PAGESIZE):
+        before = clock()
+        buffer[offset] = 1
+        elapsed = clock() - before
+
+        if elapsed > worst:
+            worst = elapsed
+
+        if elapsed > stall_ns:
+            stalls += 1
+
+    total = clock() - start
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    buffer.close()
+
+    return {
+        "minor_faults": after.ru_minflt - faults.ru_minflt,
+        "major_faults": after.ru_majflt - faults.ru_majflt,
+        "stalls": stalls,
+        "max_us": worst // 1000,
+        "total_ms": total // 1000000,
+    }
+
+
+def run_memory_probe(size_mb=256, output_format="text"):
+    size = size_mb << 20
+    libc = ctypes.CDLL(None, use_errno=True)
+    mcl_current, mcl_future = 1, 2
+    results = {"unlocked": touch_pages(size), "locked": None, "error": None}
+
+    if libc.mlockall(mcl_current | mcl_future) == 0:
+        try:
+            results["locked"] = touch_pages(size)
+        finally:
+            libc.munlockall()
+    else:
+        results["error"] = os.strerror(ctypes.get_errno())
+
+    if output_format == "text":
+        print(f"Touched {size_mb} MiB, one write per page, stalls are page "
+              "touches slower than 100 us.")
+        print(f"{'':>9} {'minor':>8} {'major':>6} {'stalls':>7} "
+              f"{'max us':>7} {'total ms':>9}")
+
+        for name in ("unlocked", "locked"):
+            probe = results[name]
+
+            if probe is None:
+                print(f"{name:>9} mlockall failed: {results['error']}")
+                continue
+
+            print(f"{name:>9} {probe['minor_faults']:>8} "
+                  f"{probe['major_faults']:>6} {probe['stalls']:>7} "
+                  f"{probe['max_us']:>7} {probe['total_ms']:>9}")
+    else:
+        print(json.dumps(results))
+
+    return results
+
+
+def write_histogram(path, results):
+    histograms = [histogram for histogram, _ in results.values()]
+    last = max(
+        (max((i for i, count in enumerate(histogram.counts) if count),
+             default=0) for histogram in histograms), default=0)
+
+    with open(path, "w") as f:
+        f.write("# us " + " ".join(
+            f"cpu{cpu}" for cpu in results) + "\n")
+
+        for latency_us in range(last + 1):
+            f.write(f"{latency_us} " + " ".join(
+                str(histogram.counts[latency_us])
+                for histogram in histograms) + "\n")
+
+
+def run_irq_rates(sysroot, window=2.0, samples=2, threshold=1000.0,
+                  output_format="text"):
+    rates = sample_rates(sysroot, window, samples)
+    noisy = rates.noisy(threshold)
+    busiest = rates.busiest()
+
+    if output_format == "text":
+        print(f"Busiest IRQs over {window:g} s (interrupts per second):")
+
+        for total, label, description, row in busiest:
+            per_cpu = ", ".join(
+                f"CPU {cpu}: {rate:.0f}"
+                for cpu, rate in zip(rates.cpus, row) if rate)
+            print(f"  {label:>6} {total:>10.0f}  {description}  ({per_cpu})")
+
+        print("")
+
+        if noisy:
+            print("IRQs firing on the same CPU as sound card or USB IRQs:")
+
+            for cpu, label, rate, description in noisy:
+                print(f"  CPU {cpu}: IRQ {label} at {rate:.0f}/s "
+                      f"({description})")
+        else:
+            print(f"No IRQs above {threshold:g}/s share a CPU with sound "
+                  "card or USB IRQs.")
+    else:
+        print(json.dumps({
+            "window": window,
+            "busiest": [
+                {"irq": label, "rate": total, "description": description}
+                for total, label, description, _ in busiest],
+            "noisy": [
+                {"cpu": cpu, "irq": label, "rate": rate,
+                 "description": description}
+                for cpu, label, rate, description in noisy]}))
+
+    return noisy
+
+
+def run_clocks(cpus=None, calls=100000, output_format="text"):
+    cpus = sorted(cpus or os.sched_getaffinity(0))
+    results = measure_clocks(cpus, calls)
+
+    if output_format == "text":
+        print(f"{'CPU':>5} {'clock':<20} {'ns/call':>9} {'max step us':>12} "
+              f"{'backwards':>10}")
+
+        for cpu, clocks in results.items():
+            for clock, result in clocks.items():
+                print(f"{cpu:>5} {clock:<20} {result['ns_per_call']:>9.1f} "
+                      f"{result['max_step_ns'] / 1000:>12.1f} "
+                      f"{result['backwards']:>10}")
+    else:
+        print(json.dumps({"calls": calls, "cpus": {
+            str(cpu): clocks for cpu, clocks in results.items()}}))
+
+    return results
+
+
+def read_timings(fd, block_size, offsets):
+    timings = []
+    clock = time.perf_counter_ns
+
+    for offset in offsets:
+        before = clock()
+        os.pread(fd, block_size, offset)
+        timings.append(clock() - before)
+
+    return sorted(timings)
+
+
+def percentile_us(timings, percent):
+    if not timings:
+        return None
+
+    index = min(int(len(timings) * percent / 100), len(timings) - 1)
+    return timings[index] // 1000
+
+
+def stream_mount(mount_point, size, seq_block=1 << 20, random_block=4096,
+                 random_reads=2048):
+    chunk = os.urandom(seq_block)
+
+    with tempfile.NamedTemporaryFile(
+            dir=mount_point, prefix=".rtcqs-bench-") as f:
+        fd = f.fileno()
+
+        for _ in range(size // seq_block):
+            os.write(fd, chunk)
+
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, size, os.POSIX_FADV_DONTNEED)
+        start = time.perf_counter_ns()
+        sequential = read_timings(
+            fd, seq_block, range(0, size, seq_block))
+        elapsed = time.perf_counter_ns() - start
+        os.posix_fadvise(fd, 0, size, os.POSIX_FADV_DONTNEED)
+        offsets = [
+            random.randrange(size // random_block) * random_block
+            for _ in range(random_reads)]
+        scattered = read_timings(fd, random_block, offsets)
+
+    return {
+        "sequential": {
+            "p50": percentile_us(sequential, 50),
+            "p99": percentile_us(sequential, 99),
+            "mb_s": round(size / (elapsed / 1e9) / 1e6, 1)},
+        "random": {
+            "p50": percentile_us(scattered, 50),
+            "p99": percentile_us(scattered, 99)},
+    }
+
+
+def run_disks(sysroot, mount_points=None, size_mb=256, output_format="text"):
+    good_fs = ("ext4", "xfs", "zfs", "btrfs")
+    results = {}
+
+    if not mount_points:
+        mount_points = [
+            mount.mount_point for mount in read_mounts(sysroot)
+            if mount.fstype.split(".")[0] in good_fs and
+            "ro" not in mount.options and
+            os.access(mount.mount_point, os.W_OK)]
+
+    for mount_point in dict.fromkeys(mount_points):
+        try:
+            results[mount_point] = stream_mount(mount_point, size_mb << 20)
+        except OSError as e:
+            results[mount_point] = {"error": str(e)}
+
+    if output_format == "text":
+        print(f"Streamed a {size_mb} MiB file per mount, 1 MiB sequential "
+              "and 4 KiB random reads with a cold page cache.")
+        print(f"{'mount':<24} {'seq p50':>8} {'seq p99':>8} {'MB/s':>8} "
+              f"{'rnd p50':>8} {'rnd p99':>8}")
+
+        for mount_point, result in results.items():
+            if "error" in result:
+                print(f"{mount_point:<24} {result['error']}")
+                continue
+
+            sequential = result["sequential"]
+            scattered = result["random"]
+            print(f"{mount_point:<24} {sequential['p50']:>8} "
+                  f"{sequential['p99']:>8} {sequential['mb_s']:>8} "
+                  f"{scattered['p50']:>8} {scattered['p99']:>8}")
+
+        print("All latencies in microseconds.")
+    else:
+        print(json.dumps({"size_mb": size_mb, "mounts": results}))
+
+    return results
+
+
+def time_scan(root, repeat=3):
+    from rtcqs.rtcqs import Rtcqs
+    from rtcqs.sysroot import SnapshotSysroot
+
+    timings = {}
+
+    for _ in range(repeat):
+        app = Rtcqs(SnapshotSysroot(root))
+        app.gui_status = True
+        app.process_window = 0
+        profiler = app.enable_profiling()
+        start = time.perf_counter()
+        app.main(jobs=1)
+        total = time.perf_counter() - start
+
+        for name, profile in profiler.profiles.items():
+            timings[name] = min(timings.get(name, profile.wall),
+                                profile.wall)
+
+        timings["total"] = min(timings.get("total", total), total)
+
+    return {name: round(wall * 1000, 3) for name, wall in timings.items()}
+
+
+def compare_scans(results, baseline, threshold=1.25, min_delta_ms=2.0):
+    regressions = []
+
+    for scale, timings in results.items():
+        for name, wall_ms in timings.items():
+            before = baseline.get(scale, {}).get(name)
+
+            if before is None:
+                continue
+
+            if wall_ms > before * threshold and \
+                    wall_ms - before > min_delta_ms:
+                regressions.append((scale, name, before, wall_ms))
+
+    return regressions
+
+
+def run_scan_bench(scales, repeat=3, output_format="text", output_path=None,
+                   baseline_path=None, threshold=1.25):
+    from rtcqs.fixtures import SCALES, write_fixture
+
+    results = {}
+
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix="rtcqs-bench-") as root:
+            write_fixture(root, **SCALES[scale])
+            results[scale] = time_scan(root, repeat)
+
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    regressions = []
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            regressions = compare_scans(results, json.load(f), threshold)
+
+    if output_format == "text":
+        checks = list(results[scales[0]])
+        print(f"{'check':<20}" + "".join(
+            f"{scale:>10}" for scale in scales))
+
+        for name in checks:
+            print(f"{name:<20}" + "".join(
+                f"{results[scale].get(name, 0):>10.1f}" for scale in scales))
+
+        print("Best of {} runs in milliseconds, scales: {}.".format(
+            repeat, ", ".join(
+                f"{scale} ({SCALES[scale]['cpus']} CPUs, "
+                f"{SCALES[scale]['irqs']} IRQs, "
+                f"{SCALES[scale]['mounts']} mounts)" for scale in scales)))
+
+        for scale, name, before, after in regressions:
+            print(f"Regression: {name} at {scale} scale took {after:.1f} ms, "
+                  f"baseline {before:.1f} ms.")
+    else:
+        print(json.dumps({
+            "scales": {scale: SCALES[scale] for scale in scales},
+            "results": results,
+            "regressions": [
+                {"scale": scale, "check": name, "baseline_ms": before,
+                 "ms": after}
+                for scale, name, before, after in regressions]}))
+
+    return regressions
+
+
+def time_command(command, runs):
+    import subprocess
+
+    timings = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def run_startup(runs=10, target_ms=50.0, output_format="text"):
+    commands = {
+        "python": [sys.executable, "-c", "pass"],
+        "import": [sys.executable, "-c", "import rtcqs.rtcqs"],
+        "cli": [sys.executable, "-c", "from rtcqs.rtcqs import main; main()",
+                "--help"],
+        "gui import": [sys.executable, "-c", "import rtcqs.rtcqs_gui"],
+    }
+    timings = {
+        name: round(time_command(command, runs), 1)
+        for name, command in commands.items()}
+    overhead = round(timings["cli"] - timings["python"], 1)
+    slow = overhead > target_ms
+
+    if output_format == "text":
+        for name, median in timings.items():
+            print(f"{name:<12} {median:>8.1f} ms")
+
+        print(f"rtcqs adds {overhead:.1f} ms to interpreter startup, "
+              f"target {target_ms:g} ms (median of {runs} runs).")
+    else:
+        print(json.dumps({
+            "runs": runs, "median_ms": timings, "overhead_ms": overhead,
+            "target_ms": target_ms, "slow": slow}))
+
+    return slow
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import os
+import time
+
+SLOW_CLOCKSOURCES = {"hpet", "acpi_pm", "jiffies", "refined-jiffies", "pit"}
+SLOW_CALL_NS = 1000
+
+
+def clocks():
+    readers = {
+        name: (lambda clock_id=getattr(time, name):
+               time.clock_gettime_ns(clock_id))
+        for name in ("CLOCK_MONOTONIC", "CLOCK_MONOTONIC_RAW",
+                     "CLOCK_REALTIME", "CLOCK_BOOTTIME")
+        if hasattr(time, name)}
+    readers["perf_counter"] = time.perf_counter_ns
+    return readers
+
+
+def measure_clock(read, calls=1000, block=50):
+    stamps = [read() for _ in range(max(calls, block))]
+    steps = [b - a for a, b in zip(stamps, stamps[1:])]
+    spans = [
+        stamps[end - 1] - stamps[end - block]
+        for end in range(block, len(stamps) + 1, block)]
+
+    return {
+        "ns_per_call": min(spans) / (block - 1),
+        "max_step_ns": max(steps),
+        "backwards": sum(step < 0 for step in steps),
+    }
+
+
+def measure_clocks(cpus, calls=1000):
+    readers = clocks()
+    affinity = os.sched_getaffinity(0)
+    results = {}
+
+    try:
+        for cpu in cpus:
+            try:
+                os.sched_setaffinity(0, {cpu})
+            except OSError:
+                continue
+
+            results[cpu] = {
+                name: measure_clock(read, calls)
+                for name, read in readers.items()}
+    finally:
+        os.sched_setaffinity(0, affinity)
+
+    return results
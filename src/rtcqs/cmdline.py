@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+from rtcqs.cpulist import parse_cpu_list, cpu_bits
+
+ISOLCPUS_FLAGS = ("nohz", "domain", "managed_irq")
+
+
+class KernelCmdline:
+    def __init__(self, tokens=()):
+        self.tokens = list(tokens)
+        self.params = {}
+
+        for token in self.tokens:
+            if token == "--":
+                break
+
+            key, sep, value = token.partition("=")
+            self.params[key.replace("-", "_")] = value if sep else None
+
+    @classmethod
+    def parse(cls, text):
+        tokens = []
+        token = []
+        quoted = False
+
+        for char in text.strip():
+            if char == '"':
+                quoted = not quoted
+            elif char.isspace() and not quoted:
+                if token:
+                    tokens.append("".join(token))
+                    token = []
+            else:
+                token.append(char)
+
+        if token:
+            tokens.append("".join(token))
+
+        return cls(tokens)
+
+    def __contains__(self, token):
+        key, sep, value = token.partition("=")
+        key = key.replace("-", "_")
+
+        if key not in self.params:
+            return False
+
+        return not sep or self.params[key] == value
+
+    def get(self, key, default=None):
+        return self.params.get(key.replace("-", "_"), default)
+
+    def cpu_bits(self, key, last_cpu):
+        key = key.replace("-", "_")
+
+        if key not in self.params:
+            return None
+
+        value = self.params[key]
+
+        if value is None:
+            value = "all"
+
+        cpus = []
+
+        for part in value.split(","):
+            if part in ISOLCPUS_FLAGS and key == "isolcpus":
+                continue
+            elif part == "all":
+                part = f"0-{last_cpu}"
+
+            cpus.append(part.replace("N", str(last_cpu)))
+
+        return cpu_bits(parse_cpu_list(",".join(cpus)))
+
+    def isolcpus_flags(self):
+        value = self.get("isolcpus")
+
+        if value is None:
+            return set()
+
+        flags = {part for part in value.split(",") if part in ISOLCPUS_FLAGS}
+        return flags or {"domain"}
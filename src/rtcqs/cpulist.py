@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+
+def parse_cpu_list(text):
+    cpus = set()
+
+    for part in text.strip().split(","):
+        part = part.strip()
+
+        if not part:
+            continue
+
+        first, sep, last = part.partition("-")
+
+        if not sep:
+            first = last = int(first)
+            used = group = 1
+        else:
+            last, sep, pattern = last.partition(":")
+            first, last = int(first), int(last)
+
+            if sep:
+                used, sep, group = pattern.partition("/")
+
+                if not sep:
+                    raise ValueError(f"invalid CPU list group '{part}'")
+
+                used, group = int(used), int(group)
+            else:
+                used = group = last - first + 1
+
+        if first < 0 or first > last or group <= 0 or used > group:
+            raise ValueError(f"invalid CPU list range '{part}'")
+
+        for start in range(first, last + 1, group):
+            cpus.update(range(start, min(start + used, last + 1)))
+
+    return sorted(cpus)
+
+
+def format_cpu_list(cpus):
+    ranges = []
+
+    for cpu in sorted(cpus):
+        if ranges and ranges[-1][1] == cpu - 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+
+    return ",".join(
+        str(first) if first == last else f"{first}-{last}"
+        for first, last in ranges)
+
+
+def cpu_bits(cpus):
+    bits = 0
+
+    for cpu in cpus:
+        bits |= 1 << cpu
+
+    return bits
+
+
+def bits_cpus(bits):
+    cpus = []
+
+    while bits:
+        low = bits & -bits
+        cpus.append(low.bit_length() - 1)
+        bits ^= low
+
+    return cpus
+
+
+def parse_cpu_mask(text):
+    return int(text.strip().replace(",", "") or "0", 16)
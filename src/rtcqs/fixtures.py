@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+import os
+import gzip
+import json
+from rtcqs.sysroot import FACTS_FILE
+
+RELEASE = "6.1.0-synthetic"
+
+SCALES = {
+    "small": {"cpus": 4, "irqs": 50, "mounts": 10, "kconfig": 300,
+              "processes": 50},
+    "medium": {"cpus": 64, "irqs": 500, "mounts": 1000, "kconfig": 8000,
+               "processes": 500},
+    "large": {"cpus": 512, "irqs": 5000, "mounts": 10000, "kconfig": 20000,
+              "processes": 5000},
+}
+
+IDLE_STATES = (("POLL", 0, 0), ("C1", 2, 2), ("C1E", 10, 20),
+               ("C6", 133, 400))
+
+
+class FixtureWriter:
+    def __init__(self, root):
+        self.root = root
+
+    def write(self, path, data):
+        host_path = os.path.join(self.root, path.lstrip("/"))
+        os.makedirs(os.path.dirname(host_path), exist_ok=True)
+
+        with open(host_path, "wb") as f:
+            f.write(data if isinstance(data, bytes) else data.encode())
+
+
+def task_stat(pid, comm, ppid, num_threads=1, policy=0, priority=0,
+              utime=0):
+    fields = [0] * 44
+    fields[0] = "S"
+    fields[1] = ppid
+    fields[11] = utime
+    fields[15] = -priority - 1 if policy else 20
+    fields[17] = num_threads
+    fields[36] = pid % 4
+    fields[37] = priority
+    fields[38] = policy
+    return f"{pid} ({comm}) " + " ".join(map(str, fields)) + "\n"
+
+
+def write_cpus(writer, cpus):
+    cpu_dir = "/sys/devices/system/cpu"
+    writer.write(f"{cpu_dir}/online", f"0-{cpus - 1}\n")
+    writer.write(f"{cpu_dir}/smt/active", "1\n")
+
+    for cpu in range(cpus):
+        policy = f"{cpu_dir}/cpufreq/policy{cpu}"
+        writer.write(f"{policy}/affected_cpus", f"{cpu}\n")
+        writer.write(f"{policy}/scaling_governor",
+                     "powersave\n" if cpu % 8 == 7 else "performance\n")
+        writer.write(f"{policy}/energy_performance_preference",
+                     "performance\n")
+        writer.write(f"{policy}/scaling_max_freq", "4800000\n")
+        writer.write(f"{policy}/scaling_cur_freq", "3200000\n")
+
+        for i, (name, latency, residency) in enumerate(IDLE_STATES):
+            state = f"{cpu_dir}/cpu{cpu}/cpuidle/state{i}"
+            writer.write(f"{state}/name", f"{name}\n")
+            writer.write(f"{state}/latency", f"{latency}\n")
+            writer.write(f"{state}/residency", f"{residency}\n")
+            writer.write(f"{state}/disable", "0\n")
+
+
+def irq_description(irq):
+    if irq == 40:
+        return "IR-PCI-MSI 514048-edge snd_hda_intel:card0"
+    elif irq == 41:
+        return "IR-PCI-MSI 327680-edge xhci_hcd"
+    elif irq % 97 == 13:
+        return "IO-APIC 16-fasteoi ehci_hcd:usb1, i801_smbus"
+
+    return f"IR-PCI-MSI {irq * 2048}-edge nvme0q{irq}"
+
+
+def write_irqs(writer, cpus, irqs):
+    lines = ["".join(f"{f'CPU{cpu}':>11}" for cpu in range(cpus))]
+
+    for irq in range(irqs):
+        counts = "".join(
+            f"{(irq * 7919 + cpu * 104729) % 100000:>11}"
+            if cpu % 5 == irq % 5 else f"{0:>11}" for cpu in range(cpus))
+        lines.append(f"{irq:>4}:{counts}  {irq_description(irq)}")
+
+    for label in ("NMI", "LOC", "RES", "CAL", "TLB"):
+        counts = "".join(f"{cpu * 31:>11}" for cpu in range(cpus))
+        lines.append(f"{label}:{counts}   {label} interrupts")
+
+    writer.write("/proc/interrupts", "\n".join(lines) + "\n")
+
+    for irq in range(irqs):
+        writer.write(f"/proc/irq/{irq}/smp_affinity_list",
+                     f"{irq % cpus}\n")
+
+
+def write_mounts(writer, mounts):
+    disks = max(min(mounts // 100, 64), 1)
+    fstypes = ("ext4", "xfs", "btrfs", "tmpfs", "nfs4", "fuse.sshfs")
+    mountinfo = ["22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw"]
+    proc_mounts = ["/dev/sda1 / ext4 rw,relatime 0 0"]
+
+    for disk in range(disks):
+        name = f"sd{chr(97 + disk % 26)}{disk // 26 or ''}"
+        writer.write(f"/sys/block/{name}/dev", f"8:{disk * 16}\n")
+        writer.write(f"/sys/block/{name}/{name}1/dev", f"8:{disk * 16 + 1}\n")
+        writer.write(f"/sys/block/{name}/queue/scheduler",
+                     "[none] mq-deadline kyber bfq\n")
+        writer.write(f"/sys/block/{name}/queue/rotational",
+                     f"{disk % 2}\n")
+        writer.write(f"/sys/block/{name}/queue/nr_requests", "256\n")
+
+    for i in range(1, mounts):
+        fstype = fstypes[i % len(fstypes)]
+        mount_point = f"/srv/vol{i}"
+        dev = f"8:{(i % disks) * 16 + 1}"
+        mountinfo.append(
+            f"{22 + i} 22 {dev} / {mount_point} rw,noatime shared:{i} - "
+            f"{fstype} /dev/vol{i} rw")
+        proc_mounts.append(f"/dev/vol{i} {mount_point} {fstype} rw 0 0")
+
+    writer.write("/proc/self/mountinfo", "\n".join(mountinfo) + "\n")
+    writer.write("/proc/mounts", "\n".join(proc_mounts) + "\n")
+
+
+def write_kernel_config(writer, symbols):
+    lines = [
+        "CONFIG_HZ_1000=y", "CONFIG_HZ=1000", "CONFIG_HIGH_RES_TIMERS=y",
+        "CONFIG_NO_HZ_FULL=y", "CONFIG_PREEMPT_RT=y",
+        "# CONFIG_PREEMPT_NONE is not set"]
+
+    for i in range(symbols):
+        if i % 3 == 0:
+            lines.append(f"# CONFIG_SYNTHETIC_{i} is not set")
+        else:
+            lines.append(f"CONFIG_SYNTHETIC_{i}={'m' if i % 3 == 1 else 'y'}")
+
+    writer.write("/proc/config.gz",
+                 gzip.compress(("\n".join(lines) + "\n").encode()))
+    writer.write("/proc/cmdline",
+                 "BOOT_IMAGE=/vmlinuz root=/dev/sda1 ro threadirqs\n")
+
+
+def write_processes(writer, processes, irqs):
+    names = ("bash", "firefox", "pipewire", "ardour", "baloo_file", "sshd")
+    pid = 1000
+
+    for irq in range(irqs):
+        comm = f"irq/{irq}-{irq_description(irq).split()[-1][:8]}"
+        writer.write(f"/proc/{pid}/stat",
+                     task_stat(pid, comm, 2, policy=1, priority=50))
+        pid += 1
+
+    for i in range(processes):
+        comm = names[i % len(names)]
+        threads = 1 if i % 4 else 8
+        writer.write(f"/proc/{pid}/stat", task_stat(
+            pid, comm, 1, threads, utime=i * 13))
+        writer.write(f"/proc/{pid}/task/{pid}/stat", task_stat(
+            pid, comm, 1, threads))
+
+        for tid in range(pid + 1, pid + threads):
+            realtime = comm == "ardour" and tid == pid + 1
+            writer.write(f"/proc/{pid}/task/{tid}/stat", task_stat(
+                tid, f"{comm}:w", 1, threads, 1 if realtime else 0,
+                70 if realtime else 0))
+
+        pid += threads
+
+
+def write_fixture(root, cpus=4, irqs=50, mounts=10, kconfig=300,
+                  processes=50):
+    writer = FixtureWriter(root)
+    writer.write("/proc/sys/kernel/osrelease", f"{RELEASE}\n")
+    writer.write("/proc/sys/kernel/hostname", f"synthetic-{cpus}\n")
+    writer.write("/proc/meminfo", "MemTotal:       65536000 kB\n")
+    writer.write("/proc/swaps",
+                 "Filename\tType\tSize\tUsed\tPriority\n")
+    writer.write("/proc/sys/vm/swappiness", "10\n")
+
+    for setting, value in (
+            ("dirty_ratio", 20), ("dirty_bytes", 0),
+            ("dirty_background_ratio", 10), ("dirty_background_bytes", 0),
+            ("dirty_expire_centisecs", 3000),
+            ("dirty_writeback_centisecs", 500),
+            ("compaction_proactiveness", 20)):
+        writer.write(f"/proc/sys/vm/{setting}", f"{value}\n")
+
+    writer.write("/sys/kernel/mm/transparent_hugepage/enabled",
+                 "always [madvise] never\n")
+    writer.write("/sys/kernel/mm/transparent_hugepage/defrag",
+                 "always defer defer+madvise [madvise] never\n")
+    writer.write("/sys/devices/system/cpu/nohz_full", f"1-{cpus - 1}\n")
+    write_cpus(writer, cpus)
+    write_irqs(writer, cpus, irqs)
+    write_mounts(writer, mounts)
+    write_kernel_config(writer, kconfig)
+    write_processes(writer, processes, irqs)
+    writer.write(f"/{FACTS_FILE}", json.dumps({
+        "user": "audio",
+        "rlimits": {"RLIMIT_RTPRIO": 95, "RLIMIT_MEMLOCK": -1},
+        "access": {"/dev/cpu_dma_latency": True},
+        "rt_prio_error": None}))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import concurrent.futures
+from rtcqs.rtcqs import Rtcqs
+from rtcqs.sysroot import SnapshotSysroot
+
+SNAPSHOT_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.xz", ".tar.bz2")
+
+
+def find_snapshots(fleet_dir):
+    with os.scandir(fleet_dir) as entries:
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            if entry.is_dir() or entry.name.endswith(SNAPSHOT_SUFFIXES):
+                yield entry.path
+
+
+def scan_snapshot(path, check_jobs=4):
+    record = {"snapshot": path}
+
+    try:
+        app = Rtcqs(SnapshotSysroot(path))
+        app.gui_status = True
+        record["host"] = app.sysroot.hostname()
+        app.main(jobs=check_jobs)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        return record
+
+    record["release"] = app.kernel.get("release")
+    record["status"] = app.status
+    record["failed"] = [
+        check for check, status in app.status.items() if not status]
+    record["governors"] = sorted(set(app.cpu_governor.values()))
+
+    return record
+
+
+class FleetSummary:
+    def __init__(self):
+        self.hosts = 0
+        self.errors = 0
+        self.failed = {}
+        self.governors = {}
+
+    def add(self, record):
+        self.hosts += 1
+
+        if "error" in record:
+            self.errors += 1
+            return
+
+        for check in record["failed"]:
+            self.failed[check] = self.failed.get(check, 0) + 1
+
+        for governor in record["governors"]:
+            if governor != "performance":
+                self.governors[governor] = \
+                    self.governors.get(governor, 0) + 1
+
+    def format(self):
+        parts = [
+            f"{count} with {governor} governor"
+            for governor, count in sorted(self.governors.items())]
+        parts += [
+            f"{count} failing {check}"
+            for check, count in sorted(
+                self.failed.items(), key=lambda item: (-item[1], item[0]))]
+
+        if self.errors:
+            parts.append(f"{self.errors} could not be analysed")
+
+        summary = f"{self.hosts} hosts"
+
+        if parts:
+            summary += ": " + ", ".join(parts)
+
+        return summary
+
+
+def run_fleet(fleet_dir, output=None, jobs=None, check_jobs=4):
+    jobs = jobs or os.cpu_count() or 1
+    max_pending = jobs * 4
+    summary = FleetSummary()
+    snapshots = find_snapshots(fleet_dir)
+    out = open(output, "w") if output else sys.stdout
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            pending = set()
+
+            for path in snapshots:
+                pending.add(
+                    executor.submit(scan_snapshot, path, check_jobs))
+
+                if len(pending) >= max_pending:
+                    done, pending = concurrent.futures.wait(
+                        pending,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    write_records(done, out, summary)
+
+            done, pending = concurrent.futures.wait(pending)
+            write_records(done, out, summary)
+    finally:
+        if output:
+            out.close()
+
+    print(summary.format(), file=sys.stderr if not output else sys.stdout)
+
+    return summary
+
+
+def write_records(futures, out, summary):
+    for future in futures:
+        record = future.result()
+        summary.add(record)
+        out.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    out.flush()
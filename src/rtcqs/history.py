@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import itertools
+from rtcqs.results import VOLATILE_KEYS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    host TEXT NOT NULL,
+    release TEXT,
+    time REAL NOT NULL,
+    label TEXT
+);
+CREATE INDEX IF NOT EXISTS scans_host_time ON scans (host, time);
+CREATE INDEX IF NOT EXISTS scans_host_label ON scans (host, label)
+    WHERE label IS NOT NULL;
+CREATE TABLE IF NOT EXISTS results (
+    scan_id INTEGER NOT NULL,
+    check_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (scan_id, check_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS check_values (
+    scan_id INTEGER NOT NULL,
+    check_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (scan_id, check_id, key)
+) WITHOUT ROWID;
+"""
+
+
+def default_path():
+    data_home = os.environ.get("XDG_DATA_HOME") or \
+        os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(data_home, "rtcqs", "history.sqlite3")
+
+
+def flatten(values, prefix=""):
+    if isinstance(values, dict):
+        items = values.items()
+    elif isinstance(values, (list, tuple)):
+        items = enumerate(values)
+    else:
+        if values is None or isinstance(values, str):
+            yield prefix, values
+        else:
+            yield prefix, json.dumps(values)
+        return
+
+    for key, value in items:
+        yield from flatten(value, f"{prefix}.{key}" if prefix else str(key))
+
+
+def key_range(pattern):
+    if pattern.endswith("*"):
+        start = pattern[:-1]
+
+        if not start:
+            return start, chr(0x10ffff)
+
+        return start, start[:-1] + chr(ord(start[-1]) + 1)
+
+    return pattern, None
+
+
+def format_time(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+
+class Scan:
+    __slots__ = ("id", "host", "release", "time", "label", "results")
+
+    def __init__(self, id, host, release, time, label, results=None):
+        self.id = id
+        self.host = host
+        self.release = release
+        self.time = time
+        self.label = label
+        self.results = results if results is not None else {}
+
+    @classmethod
+    def from_app(cls, app):
+        return cls(
+            None, app.sysroot.hostname(), app.kernel.get("release"),
+            time.time(), None, {
+                result.id: (result.status, dict(flatten(result.values)))
+                for result in app.results.values()})
+
+
+class HistoryStore:
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)),
+                    exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def add(self, scan, label=None):
+        with self.db:
+            scan.id = self.db.execute(
+                "INSERT INTO scans (host, release, time, label) "
+                "VALUES (?, ?, ?, ?)",
+                (scan.host, scan.release, scan.time, label)).lastrowid
+            self.db.executemany(
+                "INSERT INTO results (scan_id, check_id, status) "
+                "VALUES (?, ?, ?)",
+                [(scan.id, check, status)
+                 for check, (status, _) in scan.results.items()])
+            self.db.executemany(
+                "INSERT INTO check_values (scan_id, check_id, key, value) "
+                "VALUES (?, ?, ?, ?)",
+                [(scan.id, check, key, value)
+                 for check, (_, values) in scan.results.items()
+                 for key, value in values.items()])
+
+        scan.label = label
+        return scan
+
+    def find(self, host, label=None):
+        if label is None:
+            row = self.db.execute(
+                "SELECT id, host, release, time, label FROM scans "
+                "WHERE host = ? ORDER BY time DESC LIMIT 1",
+                (host,)).fetchone()
+        else:
+            row = self.db.execute(
+                "SELECT id, host, release, time, label FROM scans "
+                "WHERE host = ? AND label = ? ORDER BY time DESC LIMIT 1",
+                (host, label)).fetchone()
+
+        if row is None:
+            return None
+
+        scan = Scan(*row)
+
+        for check, status in self.db.execute(
+                "SELECT check_id, status FROM results WHERE scan_id = ?",
+                (scan.id,)):
+            scan.results[check] = (status, {})
+
+        for check, key, value in self.db.execute(
+                "SELECT check_id, key, value FROM check_values "
+                "WHERE scan_id = ?", (scan.id,)):
+            scan.results.setdefault(check, (None, {}))[1][key] = value
+
+        return scan
+
+    def transitions(self, host, check=None):
+        query = "SELECT s.time, r.check_id, r.status FROM scans s " \
+            "JOIN results r ON r.scan_id = s.id WHERE s.host = ?"
+        params = [host]
+
+        if check is not None:
+            query += " AND r.check_id = ?"
+            params.append(check)
+
+        last = {}
+
+        for scan_time, check_id, status in self.db.execute(
+                query + " ORDER BY s.time", params):
+            if last.get(check_id) != status:
+                yield scan_time, check_id, last.get(check_id), status
+                last[check_id] = status
+
+    def last_left(self, host, check, pattern, expected):
+        start, end = key_range(pattern)
+        query = "SELECT s.id, s.time, v.key, v.value FROM scans s " \
+            "JOIN check_values v ON v.scan_id = s.id AND v.check_id = ? "
+        params = [check, start]
+
+        if end is None:
+            query += "AND v.key = ? "
+        else:
+            query += "AND v.key >= ? AND v.key < ? "
+            params.append(end)
+
+        rows = self.db.execute(
+            query + "WHERE s.host = ? ORDER BY s.time DESC, s.id DESC",
+            params + [host])
+        newer = None
+
+        for (_, scan_time), group in itertools.groupby(
+                rows, key=lambda row: row[:2]):
+            offending = [
+                (key, value) for _, _, key, value in group
+                if value != expected]
+
+            if not offending and newer is not None and newer[1]:
+                return newer
+
+            newer = (scan_time, offending)
+
+        return None
+
+
+def diff_scans(old, new):
+    changes = []
+
+    for check, (status, values) in new.results.items():
+        old_status, old_values = old.results.get(check, (None, {}))
+        changed = [
+            (key, old_values.get(key), values.get(key))
+            for key in sorted(set(old_values) | set(values))
+            if old_values.get(key) != values.get(key) and
+            not VOLATILE_KEYS.intersection(key.split("."))]
+
+        if status != old_status or changed:
+            changes.append((check, old_status, status, changed))
+
+    return changes
+
+
+def run_diff(app, store, label=None, output_format="text"):
+    host = app.sysroot.hostname()
+    old = store.find(host, label)
+
+    if old is None:
+        wanted = f"scan labelled {label}" if label else "earlier scan"
+        sys.stderr.write(f"rtcqs: no {wanted} of {host} in {store.path}\n")
+        return None
+
+    changes = diff_scans(old, Scan.from_app(app))
+
+    if output_format == "text":
+        since = format_time(old.time)
+
+        if old.label:
+            since += f" ({old.label})"
+
+        if not changes:
+            print(f"No changes since the scan of {since}.")
+
+        for check, old_status, status, changed in changes:
+            if old_status != status:
+                print(f"{check}: {old_status} -> {status}")
+            else:
+                print(f"{check}:")
+
+            for key, before, after in changed:
+                print(f"  {key}: {before} -> {after}")
+    else:
+        print(json.dumps({
+            "host": host,
+            "baseline": {"time": old.time, "label": old.label},
+            "changes": [
+                {"id": check, "previous": old_status, "status": status,
+                 "values": [
+                     {"key": key, "previous": before, "value": after}
+                     for key, before, after in changed]}
+                for check, old_status, status, changed in changes]}))
+
+    return changes
+
+
+def run_history(store, host, check=None, left=None, output_format="text"):
+    if left is not None:
+        key, _, expected = left.partition("=")
+        left_check, _, pattern = key.partition(".")
+        found = store.last_left(host, left_check, pattern, expected)
+
+        if output_format != "text":
+            print(json.dumps({
+                "host": host, "check": left_check, "key": pattern,
+                "value": expected,
+                "time": found[0] if found else None,
+                "values": dict(found[1]) if found else {}}))
+        elif found is None:
+            print(f"{key} on {host} has not left {expected} in the recorded "
+                  "scans.")
+        else:
+            print(f"{key} on {host} last left {expected} at "
+                  f"{format_time(found[0])}: " + ", ".join(
+                      f"{name} = {value}" for name, value in found[1]))
+
+        return found
+
+    transitions = list(store.transitions(host, check))
+
+    if output_format == "text":
+        for scan_time, check_id, before, status in transitions:
+            print(f"{format_time(scan_time)} {check_id}: "
+                  f"{before or 'first scan'} -> {status}")
+    else:
+        print(json.dumps({"host": host, "transitions": [
+            {"time": scan_time, "id": check_id, "previous": before,
+             "status": status}
+            for scan_time, check_id, before, status in transitions]}))
+
+    return transitions
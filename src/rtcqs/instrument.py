@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import threading
+import contextlib
+from rtcqs.sysroot import Sysroot
+
+
+class CheckProfile:
+    __slots__ = ("name", "wall", "cpu", "opens", "bytes_read")
+
+    def __init__(self, name):
+        self.name = name
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.opens = 0
+        self.bytes_read = 0
+
+    def as_dict(self):
+        return {
+            "wall_ms": round(self.wall * 1000, 3),
+            "cpu_ms": round(self.cpu * 1000, 3),
+            "opens": self.opens,
+            "bytes_read": self.bytes_read,
+        }
+
+
+class CountingFile:
+    def __init__(self, f, profile):
+        self.f = f
+        self.profile = profile
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.f.close()
+
+    def __iter__(self):
+        for line in self.f:
+            self.profile.bytes_read += len(line)
+            yield line
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+    def read(self, *args):
+        data = self.f.read(*args)
+        self.profile.bytes_read += len(data)
+        return data
+
+    def readline(self, *args):
+        line = self.f.readline(*args)
+        self.profile.bytes_read += len(line)
+        return line
+
+    def readlines(self, *args):
+        return list(self)
+
+
+class ProfilingSysroot(Sysroot):
+    def __init__(self, sysroot, profiler):
+        self.sysroot = sysroot
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self.sysroot, name)
+
+    def open(self, path, mode="r"):
+        f = self.sysroot.open(path, mode)
+        profile = self.profiler.current()
+
+        if profile is None:
+            return f
+
+        profile.opens += 1
+        return CountingFile(f, profile)
+
+    def read_bytes(self, path):
+        data = self.sysroot.read_bytes(path)
+        profile = self.profiler.current()
+
+        if profile is not None:
+            profile.opens += 1
+            profile.bytes_read += len(data)
+
+        return data
+
+
+class Profiler:
+    def __init__(self, hooks=()):
+        self.hooks = list(hooks)
+        self.profiles = {}
+        self.local = threading.local()
+        self.hook_lock = threading.Lock()
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def wrap(self, sysroot):
+        return ProfilingSysroot(sysroot, self)
+
+    def current(self):
+        return getattr(self.local, "profile", None)
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        profile = self.local.profile = CheckProfile(name)
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+
+        try:
+            yield profile
+        finally:
+            profile.wall = time.perf_counter() - wall
+            profile.cpu = time.thread_time() - cpu
+            self.local.profile = None
+            self.profiles[name] = profile
+
+            with self.hook_lock:
+                for hook in self.hooks:
+                    hook(profile)
+
+    def write_table(self, out=sys.stdout):
+        profiles = sorted(
+            self.profiles.values(), key=lambda profile: -profile.wall)
+        out.write(f"{'check':<20} {'wall ms':>9} {'cpu ms':>9} "
+                  f"{'opens':>7} {'KiB read':>9}\n")
+
+        for profile in profiles:
+            out.write(f"{profile.name:<20} {profile.wall * 1000:>9.1f} "
+                      f"{profile.cpu * 1000:>9.1f} {profile.opens:>7} "
+                      f"{profile.bytes_read / 1024:>9.1f}\n")
+
+        out.write(f"{'total':<20} "
+                  f"{sum(p.wall for p in profiles) * 1000:>9.1f} "
+                  f"{sum(p.cpu for p in profiles) * 1000:>9.1f} "
+                  f"{sum(p.opens for p in profiles):>7} "
+                  f"{sum(p.bytes_read for p in profiles) / 1024:>9.1f}\n")
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+
+import re
+import time
+import array
+import operator
+import itertools
+
+SND_RE = re.compile("audiodsp|snd_.*")
+USB_RE = re.compile("[e,u,x]hci_hcd")
+
+
+class InterruptSample:
+    __slots__ = ("time", "cpus", "labels", "descriptions", "counts")
+
+    def __init__(self, time, cpus, labels, descriptions, counts):
+        self.time = time
+        self.cpus = cpus
+        self.labels = labels
+        self.descriptions = descriptions
+        self.counts = counts
+
+    @classmethod
+    def parse(cls, text, sample_time=None):
+        lines = text.splitlines()
+        cpus = [int(cpu[3:]) for cpu in lines[0].split()]
+        cpu_count = len(cpus)
+        labels = []
+        descriptions = []
+        counts = array.array("Q")
+
+        for line in lines[1:]:
+            fields = line.split(None, cpu_count + 1)
+
+            if len(fields) < 2:
+                continue
+
+            row = fields[1:cpu_count + 1]
+
+            if len(row) < cpu_count or not row[0].isdigit() or \
+                    not row[-1].isdigit():
+                continue
+
+            labels.append(fields[0].rstrip(":"))
+            descriptions.append(
+                fields[cpu_count + 1] if len(fields) > cpu_count + 1 else "")
+            counts.extend(map(int, row))
+
+        return cls(sample_time, cpus, labels, descriptions, counts)
+
+    @classmethod
+    def read(cls, sysroot):
+        with sysroot.open("/proc/interrupts", "r") as f:
+            text = f.read()
+
+        return cls.parse(text, time.monotonic())
+
+    def row(self, index):
+        cpu_count = len(self.cpus)
+        return self.counts[index * cpu_count:(index + 1) * cpu_count]
+
+    def aligned_counts(self, other):
+        if self.labels == other.labels and self.cpus == other.cpus:
+            return self.counts
+
+        cpu_count = len(other.cpus)
+        index = {label: i for i, label in enumerate(self.labels)}
+        cpu_index = {cpu: i for i, cpu in enumerate(self.cpus)}
+        counts = array.array("Q", bytes(8 * len(other.counts)))
+
+        for i, label in enumerate(other.labels):
+            if label not in index:
+                continue
+
+            row = self.row(index[label])
+
+            for j, cpu in enumerate(other.cpus):
+                if cpu in cpu_index:
+                    counts[i * cpu_count + j] = row[cpu_index[cpu]]
+
+        return counts
+
+    def deltas(self, previous):
+        before = previous.aligned_counts(self)
+
+        return array.array(
+            "Q", map(max, map(operator.sub, self.counts, before),
+                     itertools.repeat(0)))
+
+
+class Irq:
+    __slots__ = ("irq", "chip", "hwirq", "actions", "counts")
+
+    def __init__(self, irq, chip=None, hwirq=None, actions=(), counts=()):
+        self.irq = irq
+        self.chip = chip
+        self.hwirq = hwirq
+        self.actions = actions
+        self.counts = counts
+
+    @classmethod
+    def from_description(cls, irq, description, counts):
+        chip = hwirq = None
+        fields = description.split(None, 2)
+
+        if len(fields) > 1 and fields[1][:1].isdigit():
+            chip, hwirq = fields[0], fields[1]
+            rest = fields[2] if len(fields) > 2 else ""
+
+            if rest.startswith(("Level", "Edge")):
+                trigger, _, rest = rest.partition(" ")
+                hwirq = f"{hwirq} {trigger}"
+        elif fields:
+            chip = fields[0]
+            rest = description[len(chip):]
+        else:
+            rest = ""
+
+        actions = tuple(
+            action.strip() for action in rest.split(",") if action.strip())
+
+        return cls(irq, chip, hwirq, actions, counts)
+
+    @property
+    def devices(self):
+        return ", ".join(self.actions)
+
+    @property
+    def shared(self):
+        return len(self.actions) > 1
+
+
+class IrqInventory:
+    def __init__(self, cpus, irqs):
+        self.cpus = cpus
+        self.irqs = irqs
+
+    @classmethod
+    def read(cls, sysroot):
+        try:
+            sample = InterruptSample.read(sysroot)
+        except OSError:
+            return cls.read_sysfs(sysroot)
+
+        cpu_count = len(sample.cpus)
+        irqs = {}
+
+        for i, label in enumerate(sample.labels):
+            if label.isdigit():
+                irqs[int(label)] = Irq.from_description(
+                    int(label), sample.descriptions[i],
+                    sample.counts[i * cpu_count:(i + 1) * cpu_count])
+
+        return cls(sample.cpus, irqs)
+
+    @classmethod
+    def read_sysfs(cls, sysroot):
+        irq_path = "/sys/kernel/irq"
+        irqs = {}
+
+        for irq in sysroot.listdir(irq_path):
+            fields = {}
+
+            for name in ("actions", "chip_name", "hwirq"):
+                try:
+                    with sysroot.open(f"{irq_path}/{irq}/{name}", "r") as f:
+                        fields[name] = f.readline().strip()
+                except OSError:
+                    fields[name] = None
+
+            actions = tuple(
+                action.strip()
+                for action in (fields["actions"] or "").split(",")
+                if action.strip())
+            irqs[int(irq)] = Irq(
+                int(irq), fields["chip_name"], fields["hwirq"], actions)
+
+        return cls([], dict(sorted(irqs.items())))
+
+    def matching(self, regex):
+        return [irq for irq in self.irqs.values() if regex.search(irq.devices)]
+
+    def sound(self):
+        return self.matching(SND_RE)
+
+    def usb(self):
+        return self.matching(USB_RE)
+
+    def serving_cpus(self, irq):
+        return [
+            cpu for cpu, count in zip(self.cpus, self.irqs[irq].counts)
+            if count]
+
+
+class InterruptRates:
+    def __init__(self, sample, peak_rates):
+        self.cpus = sample.cpus
+        self.labels = sample.labels
+        self.descriptions = sample.descriptions
+        self.counts = sample.counts
+        self.rates = peak_rates
+
+    def rate(self, index, cpu_index):
+        return self.rates[index * len(self.cpus) + cpu_index]
+
+    def matching(self, regex):
+        return [
+            i for i, description in enumerate(self.descriptions)
+            if regex.search(description)]
+
+    def serving_cpus(self, indexes):
+        cpu_count = len(self.cpus)
+
+        return {
+            j for i in indexes for j in range(cpu_count)
+            if self.counts[i * cpu_count + j]}
+
+    def noisy(self, threshold):
+        audio = self.matching(SND_RE) + self.matching(USB_RE)
+        audio_set = set(audio)
+        cpu_count = len(self.cpus)
+        findings = []
+
+        serving = sorted(self.serving_cpus(audio))
+
+        for i, label in enumerate(self.labels):
+            row = self.rates[i * cpu_count:(i + 1) * cpu_count]
+
+            if i in audio_set or not row or max(row) < threshold:
+                continue
+
+            for j in serving:
+                if row[j] >= threshold:
+                    findings.append((self.cpus[j], label, row[j],
+                                     self.descriptions[i]))
+
+        return sorted(findings, key=lambda finding: -finding[2])
+
+    def busiest(self, limit=10):
+        cpu_count = len(self.cpus)
+        rows = []
+
+        for i, label in enumerate(self.labels):
+            row = self.rates[i * cpu_count:(i + 1) * cpu_count]
+            total = sum(row)
+
+            if total:
+                rows.append((total, label, self.descriptions[i], row))
+
+        return sorted(rows, key=lambda row: -row[0])[:limit]
+
+
+def sample_rates(sysroot, window=2.0, samples=2):
+    intervals = max(samples - 1, 1)
+    previous = InterruptSample.read(sysroot)
+    peak_rates = None
+
+    for _ in range(intervals):
+        time.sleep(window / intervals)
+        sample = InterruptSample.read(sysroot)
+        elapsed = sample.time - previous.time
+        rates = array.array(
+            "d", (delta / elapsed for delta in sample.deltas(previous)))
+
+        if peak_rates is None or len(peak_rates) != len(rates):
+            peak_rates = rates
+        else:
+            peak_rates = array.array("d", map(max, peak_rates, rates))
+
+        previous = sample
+
+    return InterruptRates(previous, peak_rates)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+import os
+import marshal
+
+
+class KernelConfig:
+    __slots__ = ("symbols",)
+
+    def __init__(self, symbols=None):
+        self.symbols = symbols if symbols is not None else {}
+
+    @classmethod
+    def parse(cls, lines):
+        symbols = {}
+
+        for line in lines:
+            if line.startswith("CONFIG_"):
+                symbol, sep, value = line.rstrip("\n").partition("=")
+
+                if not sep:
+                    continue
+
+                if len(value) > 1 and value[0] == value[-1] == '"':
+                    value = value[1:-1]
+
+                symbols[symbol[7:]] = value
+            elif line.startswith("# CONFIG_") and \
+                    line.rstrip().endswith(" is not set"):
+                symbols[line[9:line.index(" ", 9)]] = "n"
+
+        return cls(symbols)
+
+    @classmethod
+    def from_file(cls, f, compressed=False):
+        data = f.read()
+
+        if compressed:
+            import gzip
+
+            data = gzip.decompress(data)
+
+        if isinstance(data, bytes):
+            data = data.decode()
+
+        return cls.parse(data.splitlines())
+
+    @staticmethod
+    def symbol(name):
+        return name[7:] if name.startswith("CONFIG_") else name
+
+    def value(self, name, default=None):
+        return self.symbols.get(self.symbol(name), default)
+
+    def is_enabled(self, name):
+        return self.symbols.get(self.symbol(name)) in ("y", "m")
+
+    def is_builtin(self, name):
+        return self.symbols.get(self.symbol(name)) == "y"
+
+    def __contains__(self, name):
+        return self.symbol(name) in self.symbols
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __bool__(self):
+        return bool(self.symbols)
+
+
+class KernelConfigCache:
+    version = 1
+
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME") or \
+                os.path.expanduser("~/.cache")
+            cache_dir = os.path.join(cache_home, "rtcqs")
+
+        self.cache_dir = cache_dir
+
+    def path(self, release):
+        return os.path.join(self.cache_dir, f"kconfig-{release}.bin")
+
+    def key(self, release, config_path):
+        config_stat = os.stat(config_path)
+
+        return (self.version, release, os.uname().version,
+                config_path, config_stat.st_mtime_ns, config_stat.st_size)
+
+    def load(self, release, config_path, compressed=False, opener=open):
+        key = self.key(release, config_path)
+
+        try:
+            with opener(self.path(release), "rb") as f:
+                cached_key, symbols = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        else:
+            if cached_key == key:
+                return KernelConfig(symbols)
+
+        with opener(config_path, "rb") as f:
+            config = KernelConfig.from_file(f, compressed)
+
+        self.store(release, key, config)
+
+        return config
+
+    def store(self, release, key, config):
+        import tempfile
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+
+            with os.fdopen(fd, "wb") as f:
+                f.write(marshal.dumps((key, config.symbols)))
+
+            os.replace(tmp_path, self.path(release))
+            self.evict(release)
+        except OSError:
+            pass
+
+    def evict(self, current_release):
+        for entry in os.listdir(self.cache_dir):
+            if not entry.startswith("kconfig-") or \
+                    not entry.endswith(".bin"):
+                continue
+
+            release = entry[8:-4]
+
+            if release != current_release and \
+                    not os.path.exists(f"/lib/modules/{release}") and \
+                    not os.path.exists(f"/boot/config-{release}"):
+                os.remove(os.path.join(self.cache_dir, entry))
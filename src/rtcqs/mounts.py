@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+import re
+
+OCTAL_ESCAPE_RE = re.compile(r"\\([0-7]{3})")
+
+
+def unescape(field):
+    return OCTAL_ESCAPE_RE.sub(lambda match: chr(int(match.group(1), 8)),
+                               field)
+
+
+class Mount:
+    __slots__ = ("mount_point", "fstype", "source", "options", "dev",
+                 "device")
+
+    def __init__(self, mount_point, fstype, source, options, dev=None,
+                 device=None):
+        self.mount_point = mount_point
+        self.fstype = fstype
+        self.source = source
+        self.options = options
+        self.dev = dev
+        self.device = device
+
+
+class BlockDevice:
+    __slots__ = ("name", "scheduler", "rotational", "nr_requests")
+
+    def __init__(self, name, scheduler=None, rotational=None,
+                 nr_requests=None):
+        self.name = name
+        self.scheduler = scheduler
+        self.rotational = rotational
+        self.nr_requests = nr_requests
+
+    @property
+    def kind(self):
+        if self.rotational is None:
+            return "unknown"
+
+        return "HDD" if self.rotational else "SSD"
+
+
+def parse_mountinfo(text):
+    mounts = []
+
+    for line in text.splitlines():
+        head, sep, tail = line.partition(" - ")
+
+        if not sep:
+            continue
+
+        fields = head.split()
+        fstype, source, super_options = (tail.split(" ", 2) + ["", ""])[:3]
+        options = set(fields[5].split(",")) | set(super_options.split(","))
+        mounts.append(Mount(
+            unescape(fields[4]), fstype, unescape(source), options,
+            fields[2]))
+
+    return mounts
+
+
+def parse_mounts(text):
+    mounts = []
+
+    for line in text.splitlines():
+        fields = line.split()
+
+        if len(fields) >= 4:
+            mounts.append(Mount(
+                unescape(fields[1]), fields[2], unescape(fields[0]),
+                set(fields[3].split(","))))
+
+    return mounts
+
+
+def read_block_devices(sysroot):
+    devices = {}
+    dev_index = {}
+
+    try:
+        disks = sysroot.listdir("/sys/block")
+    except OSError:
+        return devices, dev_index
+
+    for disk in disks:
+        disk_dir = f"/sys/block/{disk}"
+        scheduler = sysroot.read_line(f"{disk_dir}/queue/scheduler")
+        rotational = sysroot.read_line(f"{disk_dir}/queue/rotational")
+        nr_requests = sysroot.read_line(f"{disk_dir}/queue/nr_requests")
+
+        if scheduler and "[" in scheduler:
+            scheduler = scheduler[scheduler.index("[") + 1:
+                                  scheduler.index("]")]
+
+        device = devices[disk] = BlockDevice(
+            disk, scheduler,
+            rotational == "1" if rotational is not None else None,
+            int(nr_requests) if nr_requests else None)
+        dev = sysroot.read_line(f"{disk_dir}/dev")
+
+        if dev:
+            dev_index[dev] = device
+
+        try:
+            partitions = [
+                entry for entry in sysroot.listdir(disk_dir)
+                if entry.startswith(disk)]
+        except OSError:
+            partitions = []
+
+        for partition in partitions:
+            dev = sysroot.read_line(f"{disk_dir}/{partition}/dev")
+
+            if dev:
+                dev_index[dev] = device
+
+    return devices, dev_index
+
+
+def read_mounts(sysroot):
+    try:
+        with sysroot.open("/proc/self/mountinfo", "r") as f:
+            mounts = parse_mountinfo(f.read())
+    except OSError:
+        with sysroot.open("/proc/mounts", "r") as f:
+            return parse_mounts(f.read())
+
+    _, dev_index = read_block_devices(sysroot)
+
+    for mount in mounts:
+        mount.device = dev_index.get(mount.dev)
+
+    return mounts
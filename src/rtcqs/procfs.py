@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+POLICIES = {
+    0: "SCHED_OTHER",
+    1: "SCHED_FIFO",
+    2: "SCHED_RR",
+    3: "SCHED_BATCH",
+    5: "SCHED_IDLE",
+    6: "SCHED_DEADLINE",
+}
+RT_POLICIES = (1, 2, 6)
+
+
+class TaskStat:
+    __slots__ = ("pid", "comm", "state", "ppid", "utime", "stime", "nice",
+                 "num_threads", "processor", "rt_priority", "policy")
+
+    def __init__(self, data):
+        head, _, tail = data.rpartition(")")
+        pid, _, comm = head.partition(" (")
+        fields = tail.split(None, 39)
+        self.pid = int(pid)
+        self.comm = comm
+        self.state = fields[0]
+        self.ppid = int(fields[1])
+        self.utime = int(fields[11])
+        self.stime = int(fields[12])
+        self.nice = int(fields[16])
+        self.num_threads = int(fields[17])
+        self.processor = int(fields[36])
+        self.rt_priority = int(fields[37])
+        self.policy = int(fields[38])
+
+    @property
+    def policy_name(self):
+        return POLICIES.get(self.policy, str(self.policy))
+
+    @property
+    def realtime(self):
+        return self.policy in RT_POLICIES
+
+
+def read_stat(sysroot, path):
+    try:
+        return TaskStat(sysroot.read_bytes(path).decode(errors="replace"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def iter_processes(sysroot):
+    for pid in sysroot.listdir("/proc"):
+        if pid.isdigit():
+            stat = read_stat(sysroot, f"/proc/{pid}/stat")
+
+            if stat is not None:
+                yield stat
+
+
+def iter_threads(sysroot, processes):
+    for pid, process in processes.items():
+        yield pid, process
+
+        if process.num_threads < 2:
+            continue
+
+        task_dir = f"/proc/{pid}/task"
+
+        try:
+            tids = sysroot.listdir(task_dir)
+        except OSError:
+            continue
+
+        for tid in tids:
+            if tid == str(pid):
+                continue
+
+            stat = read_stat(sysroot, f"{task_dir}/{tid}/stat")
+
+            if stat is not None:
+                yield pid, stat
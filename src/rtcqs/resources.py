@@ -1,8 +1,7 @@
 #!/usr/bin/env python3
 
-class Resources:
-    def __init__(self):
-        self.transparent_img = b'''
+RESOURCES = {
+    "transparent_img": b'''
         iVBORw0KGgoAAAANSUhEUgAAACAAAAAgCAYAAABzenr0AAABhGlDQ1BJQ0MgcHJvZmlsZQAAKJF9
         kT1Iw0AcxV9Ti6JVByuIKGSoThZERRy1CkWoEGqFVh1MLv2CJg1Jiouj4Fpw8GOx6uDirKuDqyAI
         foC4uTkpukiJ/0sKLWI9OO7Hu3uPu3eAUC0yzWobBzTdNhOxqJhKr4rtr+jCMPoRQI/MLGNOkuJo
@@ -13,8 +12,8 @@ class Resources:
         9AFIUlfxG+DgEBjNUfZ6i3d3NPf275l6fz81GnKOR9SOXAAAAAZiS0dEAP8A/wD/oL2nkwAAAAlw
         SFlzAAAuIwAALiMBeKU/dgAAAAd0SU1FB+ULHRUGGu4roaUAAAAZdEVYdENvbW1lbnQAQ3JlYXRl
         ZCB3aXRoIEdJTVBXgQ4XAAAALElEQVRYw+3OMQEAAAgDoGn/zjOGDyRg2ubT5pmAgICAgICAgICA
-        gICAgMABQLQDPYU9GZMAAAAASUVORK5CYII='''
-        self.ok_img = b'''
+        gICAgMABQLQDPYU9GZMAAAAASUVORK5CYII=''',
+    "ok_img": b'''
         iVBORw0KGgoAAAANSUhEUgAAACAAAAAgCAYAAABzenr0AAAC60lEQVR4AayVA5MkWRSFK2IDa/yE
         Nkpj29aObW+htWPbtu2Z4NhOldq2bd/JM0ZWd2Z0nYiTfPd+z0+lRFputq83Z5ipZs3X1IwxQcOa
         ymE84xv+oYzKldLdnfSb+q1pnI4z3dHx5nydNZD0QgBp+QDScWaC8Yxv+IcyKIsYxDYJ7sMY+mk4
@@ -29,8 +28,8 @@ class Resources:
         MjJGHpTZcolJqGGNM3RW56sAiZfFnqLy2iqCroo9cTrtHkH4Fhx9TDEcBhNsFTaDxjYidO3K2DNU
         IQIhqKqumtbEnVcIl9iI5G7FAK0ShwPguvo62hx/mfBNIx8svRUrOYw8ROC6uAu0M/EGNhm0Qj5U
         +jBSfBxjy4XlgOQfx+82wA0S+jfJBmmjlP7Ncvp3TIZC14z+ndMB754DANf99mSzjcE0AAAAAElF
-        TkSuQmCC'''
-        self.warning_img = b'''
+        TkSuQmCC''',
+    "warning_img": b'''
         iVBORw0KGgoAAAANSUhEUgAAACAAAAAgCAYAAABzenr0AAACL0lEQVR4AcWXtdYUMRTHcw4Nzktg
         DboNLjPJTHY/qXC3h4EOKeEFsB6eAFrcoaXBZWTl8v3wtWQ+Tc65K8k/93fjiZpM+rxr1+osSs8U
         OrmRG/Om0OY7xm/yKEOjZjK9TdYu+h6Zg7k2t8o0ed+xVloTViaJFL+N3+RRhgYtdag7LXi+K7al
@@ -41,8 +40,8 @@ class Resources:
         dYYNByyY+Q6zQmVRdKbjG/s4pnUA+oPohvON1jlUGEzYKtf6Zss9/thg0IFD2ODAPP5gwlaZMW9K
         t9gRxEts0nAMJmxVaJ35xH1BHDwMEO5fOHl+eLfBDh5A8CGY/CR87piEz6cwCcs4Pt2xttoyBO5b
         hs+rLUOYsBWbgXcjajSk/eBh1Y0ILXUqbUSVt+LmhUvSuX/ftxWjQVt5K57cYdQY8R1GaCofRsGP
-        48AXkvBXsvCX0vDX8vAPk/BPs/CP0+DP8x/rq16YWXwOHgAAAABJRU5ErkJggg=='''
-        self.icon_data = b'''
+        48AXkvBXsvCX0vDX8vAPk/BPs/CP0+DP8x/rq16YWXwOHgAAAABJRU5ErkJggg==''',
+    "icon_data": b'''
         iVBORw0KGgoAAAANSUhEUgAAAGAAAABgCAYAAADimHc4AAAABHNCSVQICAgIfAhkiAAAAAlwSFlz
         AAAKawAACmsBp7iByQAAABl0RVh0U29mdHdhcmUAd3d3Lmlua3NjYXBlLm9yZ5vuPBoAAAglSURB
         VHic7Z3ZTxNdGMafmUKhWFOCChZJRIhb1SDVKBFLABfuDBKrRmO8M8SEeOOdN8b/QEm8MaaJRI2B
@@ -81,8 +80,9 @@ class Resources:
         Skogl8shk8nWnXanUChYT83zer1rdqZLS0twu91gGAbDw8P48ePHurMapqamiIYigsEgPB4P5ubm
         8OfPH/T392NycnLVcznNGZfI/5Gcn5/Ho0ePIhLZZRKcPgcMDQ2xLiOXy3H58mVkZ2dzKSVl4NSA
         X79+JVROqVSisbGRSykpA6cGMAyTcFOiUqlw8uRJLuWkBJyHIhJphpapr6/nfVVispFUBlAURSw5
-        ICl4MSBZnyGSEc4NWFhY4GUuTbrCSzg60dFQJvIfhuHRNz79q54AAAAASUVORK5CYII='''
-        self.logo = b'''
+        ICl4MSBZnyGSEc4NWFhY4GUuTbrCSzg60dFQJvIfhuHRNz79q54AAAAASUVORK5CYII=
+        ''',
+    "logo": b'''
         iVBORw0KGgoAAAANSUhEUgAAAZAAAAGQCAYAAACAvzbMAAAABHNCSVQICAgIfAhkiAAAAAlwSFlz
         AAArZwAAK2cBLIoQQQAAABl0RVh0U29mdHdhcmUAd3d3Lmlua3NjYXBlLm9yZ5vuPBoAACAASURB
         VHic7d37cxX14f/x18mdXCAhBAiQIIEg94sREUO5yGUU0CJWUGvFto7WscVO/wL/gzqOWqvWWu1Y
@@ -235,4 +235,16 @@ class Resources:
         GAyqtrbWdAwAcBQF4hCWsQBEOwrEIdxIBxDtKBCHtLW1qaOjw3QMAHAMBeIglrEARDMKxEEsYwGI
         ZhSIg6qrqxUMBk3HAABHUCAO6u/vV2Njo+kYAOAICsRhLGMBiFYUiMO4kQ4gWlEgDquvr9fg4KDp
         GABgOwrEYcPDw7p8+bLpGABgOwrEBSxjAYhGFIgLuJEOIBr9PzEk5HcR1Lh1AAAAAElFTkSuQmCC
-        '''
+        ''',
+}
+
+
+class Resources:
+    def __getattr__(self, name):
+        try:
+            data = RESOURCES[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+        value = self.__dict__[name] = b"".join(data.split())
+        return value
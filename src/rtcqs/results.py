@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+VOLATILE_KEYS = {"top_cpu", "cur_freq", "clocks"}
+
+
+def stable_values(values):
+    if isinstance(values, dict):
+        return {
+            key: stable_values(value) for key, value in values.items()
+            if key not in VOLATILE_KEYS}
+    elif isinstance(values, list):
+        return [stable_values(value) for value in values]
+
+    return values
+
+
+class CheckResult:
+    __slots__ = ("id", "title", "status", "severity", "message", "values",
+                 "remediation", "url")
+
+    def __init__(self, id, title, status, severity, message, values=None,
+                 remediation=None, url=None):
+        self.id = id
+        self.title = title
+        self.status = status
+        self.severity = severity
+        self.message = message
+        self.values = values if values is not None else {}
+        self.remediation = remediation
+        self.url = url
+
+    @classmethod
+    def from_app(cls, app, spec):
+        check = spec.name
+        ok = app.status.get(check, False)
+
+        return cls(
+            check,
+            app.headline.get(check, check),
+            "ok" if ok else "warning",
+            "none" if ok else spec.severity,
+            app.output.get(check, ""),
+            app.values.get(check),
+            None if ok else app.remediation.get(check),
+            None if ok else app.urls.get(check))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -1,37 +1,83 @@
 #!/usr/bin/env python3
 
 import os
-import getpass
-import re
-import gzip
-import resource
+import sys
+import time
+import argparse
+from rtcqs.clocks import SLOW_CLOCKSOURCES, SLOW_CALL_NS
+from rtcqs.cmdline import KernelCmdline
+from rtcqs.cpulist import (
+    parse_cpu_list, format_cpu_list, cpu_bits, bits_cpus, parse_cpu_mask)
+from rtcqs.procfs import iter_processes, iter_threads
+from rtcqs.kconfig import KernelConfig, KernelConfigCache
+from rtcqs.results import CheckResult
+from rtcqs.scheduler import check, registry, select, CheckScheduler
 
 
 class Rtcqs:
-    def __init__(self):
-        self.user = getpass.getuser()
+    def __init__(self, sysroot=None):
+        import threading
+        from rtcqs.sysroot import open_sysroot
+
+        self.sysroot = sysroot or open_sysroot()
+        self.user = self.sysroot.user()
         self.wiki_url = "https://wiki.linuxaudio.org/wiki/system_configuration"
         self.gui_status = False
         self.version = "0.6.4"
-        self.headline = {}
+        self.headline = {
+            spec.name: spec.title for spec in registry(type(self))}
         self.kernel = {}
         self.output = {}
         self.status = {}
+        self.values = {}
+        self.remediation = {}
+        self.urls = {}
+        self.results = {}
+        self.output_format = "text"
+        self.cpu_governor = {}
+        self.cpu_smt = None
+        self.cpu_online = []
+        self.irq_inventory = None
+        self.idle_latency = {}
+        self.clocksource = None
+        self.use_cache = True
+        self.profiler = None
+        self.result_hooks = []
+        self.freq_window = 0
+        self.process_window = 0
+        self.buffer_frames = 128
+        self.sample_rate = 48000
+        self.local = threading.local()
+
+    def write(self, text):
+        lines = getattr(self.local, "lines", None)
+
+        if lines is None:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        else:
+            lines.append(text)
+
+    def cli_enabled(self):
+        return not self.gui_status and self.output_format == "text"
 
     def print_cli(self, message):
-        if not self.gui_status:
-            print(message)
+        if self.cli_enabled():
+            self.write(f"{message}\n")
 
     def print_version(self):
         self.print_cli(f"rtcqs - version {self.version}")
         self.print_cli("")
 
-    def print_status(self, check):
-        if not self.gui_status:
-            if self.status[check]:
-                print("[ \033[32mOK\033[00m ] ", end="")
+    def print_status(self, check, status=None):
+        if status is None:
+            status = self.status[check]
+
+        if self.cli_enabled():
+            if status:
+                self.write("[ \033[32mOK\033[00m ] ")
             else:
-                print("[ \033[31mWARNING\033[00m ] ", end="")
+                self.write("[ \033[31mWARNING\033[00m ] ")
 
     def format_output(self, check):
         char_count = int(len(self.headline[check]))
@@ -41,15 +87,17 @@ class Rtcqs:
         self.print_cli(self.output[check])
         self.print_cli("")
 
+    @check("root", "Root User", severity="low")
     def root_check(self):
         check = "root"
-        self.headline[check] = "Root User"
+        self.values[check] = {"user": self.user}
 
         if self.user == "root":
             self.status[check] = False
             self.output[check] = "You are running this script as root. " \
                 "Please run it as a regular user for the most reliable "\
                 "results."
+            self.remediation[check] = "Run rtcqs as a regular user."
 
         else:
             self.status[check] = True
@@ -57,12 +105,15 @@ class Rtcqs:
 
         self.format_output(check)
 
+    @check("audio_group", "Group Limits", severity="high")
     def audio_group_check(self):
         check = "audio_group"
-        self.headline[check] = "Group Limits"
         wiki_anchor = "#audio_group"
-        limit_rtprio = resource.getrlimit(resource.RLIMIT_RTPRIO)[1]
-        limit_memlock = resource.getrlimit(resource.RLIMIT_MEMLOCK)[1]
+        limit_rtprio = self.sysroot.rlimit("RLIMIT_RTPRIO")
+        limit_memlock = self.sysroot.rlimit("RLIMIT_MEMLOCK")
+        self.values[check] = {
+            "rtprio": limit_rtprio, "memlock": limit_memlock}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
 
         if limit_rtprio >= 75 and limit_memlock == -1:
             self.status[check] = True
@@ -80,58 +131,297 @@ class Rtcqs:
                                  "audio or realtime, with 'sudo usermod -a " \
                                  f"-G <group_name> {self.user}. See also " \
                                  f"{self.wiki_url}{wiki_anchor}"
+            self.remediation[check] = "sudo usermod -a -G <group_name> " \
+                f"{self.user}"
+
+        self.format_output(check)
 
+    @check("background_process", "Background Processes")
+    def background_process_check(self):
+        from rtcqs.alsa import read_cards, read_streams
+
+        check = "background_process"
+        offenders = {
+            "baloo_file": "file indexer",
+            "tracker-miner": "file indexer",
+            "tracker-extract": "file indexer",
+            "localsearch": "file indexer",
+            "updatedb": "file indexer",
+            "power-profiles-": "power daemon",
+            "auto-cpufreq": "power daemon",
+            "thermald": "power daemon",
+            "powertop": "power daemon",
+        }
+        audio_servers = {
+            "pulseaudio": "PulseAudio",
+            "pipewire": "PipeWire",
+            "jackd": "JACK",
+            "jackdbus": "JACK",
+        }
+        start = time.monotonic()
+        processes = {stat.pid: stat for stat in iter_processes(self.sysroot)}
+        rt_threads = []
+        thread_pids = {}
+
+        if not processes:
+            self.status[check] = True
+            self.output[check] = "Process data is unavailable, background " \
+                "processes could not be checked."
+            self.format_output(check)
+            return
+
+        if self.sysroot.name == "live":
+            processes.pop(os.getpid(), None)
+
+        for pid, stat in iter_threads(self.sysroot, processes):
+            thread_pids[stat.pid] = pid
+
+            if stat.realtime and processes[pid].ppid != 2 and pid != 2:
+                rt_threads.append({
+                    "pid": pid, "tid": stat.pid, "comm": stat.comm,
+                    "process": processes[pid].comm,
+                    "policy": stat.policy_name,
+                    "priority": stat.rt_priority})
+
+        rt_threads.sort(key=lambda thread: -thread["priority"])
+        top = []
+
+        if self.process_window > 0 and processes \
+                and self.sysroot.name == "live":
+            time.sleep(max(self.process_window - time.monotonic() + start, 0))
+            elapsed = time.monotonic() - start
+            hz = os.sysconf("SC_CLK_TCK")
+
+            for stat in iter_processes(self.sysroot):
+                before = processes.get(stat.pid)
+
+                if before is None or before.comm != stat.comm:
+                    continue
+
+                ticks = stat.utime + stat.stime - before.utime - before.stime
+                usage = ticks * 100 / hz / elapsed
+
+                if usage >= 1:
+                    top.append({
+                        "pid": stat.pid, "comm": stat.comm,
+                        "cpu_percent": round(usage, 1)})
+
+            top = sorted(top, key=lambda process: -process["cpu_percent"])[:5]
+
+        found = []
+        servers = {}
+        card_owners = {
+            thread_pids.get(stream.owner_pid, stream.owner_pid)
+            for stream in read_streams(self.sysroot, read_cards(self.sysroot))
+            if stream.owner_pid is not None}
+
+        for stat in processes.values():
+            for name, kind in offenders.items():
+                if stat.comm.startswith(name):
+                    found.append({
+                        "pid": stat.pid, "comm": stat.comm, "kind": kind})
+                    break
+
+            if stat.comm in audio_servers:
+                servers.setdefault(audio_servers[stat.comm], []).append(
+                    stat.pid)
+
+        holding = sorted(
+            server for server, pids in servers.items()
+            if card_owners.intersection(pids))
+        self.values[check] = {
+            "rt_threads": rt_threads, "top_cpu": top, "offenders": found,
+            "audio_servers": servers, "holding_card": holding}
+        self.status[check] = not found and len(holding) < 2
+        lines = []
+
+        for process in found:
+            lines.append(f"Found {process['comm']} (PID {process['pid']}), "
+                         f"a {process['kind']} that can cause xruns while "
+                         "it is active.")
+
+        if len(holding) > 1:
+            lines.append("More than one audio server holds a sound card: "
+                         f"{', '.join(holding)}. Only one of them should "
+                         "own the sound card.")
+
+        if rt_threads:
+            lines.append("The following threads run with a real-time "
+                         "policy: " + ", ".join(
+                             f"{thread['comm']} (PID {thread['pid']}, "
+                             f"{thread['policy']} {thread['priority']})"
+                             for thread in rt_threads))
+
+        if top:
+            lines.append(f"Top CPU consumers over {self.process_window:g} "
+                         "s: " + ", ".join(
+                             f"{process['comm']} (PID {process['pid']}) "
+                             f"{process['cpu_percent']:g}%"
+                             for process in top))
+
+        if not lines:
+            lines.append("No competing real-time or CPU hungry background "
+                         "processes found.")
+
+        if not self.status[check]:
+            self.remediation[check] = "Stop or disable the listed " \
+                "processes while working with audio, e.g. 'balooctl " \
+                "suspend' or 'systemctl stop power-profiles-daemon'."
+
+        self.output[check] = "\n".join(lines)
         self.format_output(check)
 
+    @check("governor", "CPU Frequency Scaling",
+           produces=["cpu_governor", "cpu_smt", "cpu_online"],
+           severity="high")
     def governor_check(self):
         check = "governor"
-        self.headline[check] = "CPU Frequency Scaling"
         wiki_anchor = "#cpu_frequency_scaling"
-        cpu_count = os.cpu_count()
         cpu_dir = "/sys/devices/system/cpu"
+        policy_dir = f"{cpu_dir}/cpufreq"
+        cpu_governor = self.cpu_governor = {}
+        policies = {}
         cpu_list = []
-        cpu_governor = {}
-        bad_governor = 0
+        bad_policies = []
+        slow_policies = []
 
-        if os.path.exists("/sys/devices/system/cpu/smt/active"):
-            with open("/sys/devices/system/cpu/smt/active", "r") as f:
-                self.cpu_smt = f.readline().strip()
+        self.cpu_smt = self.sysroot.read_line(f"{cpu_dir}/smt/active")
+        online = self.sysroot.read_line(f"{cpu_dir}/online")
 
-        for cpu_nr in range(cpu_count):
-            governor_path = f"{cpu_dir}/cpu{cpu_nr}/cpufreq/scaling_governor"
+        if online:
+            online_cpus = parse_cpu_list(online)
+        else:
+            online_cpus = sorted(
+                int(cpu[3:]) for cpu in self.sysroot.listdir(cpu_dir)
+                if cpu.startswith("cpu") and cpu[3:].isdigit())
 
-            try:
-                with open(governor_path, "r") as f:
-                    cpu_governor[cpu_nr] = f.readline().strip()
-                    cpu_list.append(f"CPU {cpu_nr}: {cpu_governor[cpu_nr]}")
-            except OSError as e:
-                if e.errno == 16 and not self.cpu_smt:
-                    pass
-
-        for value in cpu_governor.values():
-            if value != "performance":
-                bad_governor += 1
-
-        if bad_governor > 0:
+        self.cpu_online = online_cpus
+
+        if self.sysroot.isdir(policy_dir):
+            policy_names = [
+                policy for policy in self.sysroot.listdir(policy_dir)
+                if policy.startswith("policy") and policy[6:].isdigit()]
+        else:
+            policy_names = []
+
+        for policy in policy_names:
+            path = f"{policy_dir}/{policy}"
+            affected = self.sysroot.read_line(f"{path}/affected_cpus")
+            policies[policy] = {
+                "cpus": [int(cpu) for cpu in affected.split()]
+                if affected else [int(policy[6:])],
+                "governor": self.sysroot.read_line(
+                    f"{path}/scaling_governor"),
+                "epp": self.sysroot.read_line(
+                    f"{path}/energy_performance_preference"),
+                "max_freq": self.sysroot.read_line(
+                    f"{path}/scaling_max_freq"),
+                "cur_freq": None}
+
+        if not policies:
+            for cpu_nr in online_cpus:
+                governor = self.sysroot.read_line(
+                    f"{cpu_dir}/cpu{cpu_nr}/cpufreq/scaling_governor")
+
+                if governor is not None:
+                    policies[f"cpu{cpu_nr}"] = {
+                        "cpus": [cpu_nr], "governor": governor, "epp": None,
+                        "max_freq": None, "cur_freq": None}
+
+        if self.freq_window > 0 and policies:
+            self.sample_frequencies(policy_dir, policies)
+
+        for policy, info in sorted(
+                policies.items(), key=lambda item: min(item[1]["cpus"])):
+            cpus = [cpu for cpu in info["cpus"] if cpu in online_cpus]
+
+            if not cpus:
+                continue
+
+            for cpu_nr in cpus:
+                cpu_governor[cpu_nr] = info["governor"]
+
+            line = f"CPU {format_cpu_list(cpus)}: {info['governor']}"
+
+            if info["epp"]:
+                line += f", energy performance preference {info['epp']}"
+
+            if info["cur_freq"] is not None:
+                line += f", {info['cur_freq'] // 1000} MHz average"
+
+            cpu_list.append(line)
+
+            if info["governor"] != "performance":
+                bad_policies.append(policy)
+            elif info["cur_freq"] is not None and info["max_freq"] and \
+                    info["cur_freq"] < int(info["max_freq"]) / 2:
+                slow_policies.append(policy)
+
+        self.values[check] = {
+            "online": online_cpus,
+            "governors": cpu_governor,
+            "policies": policies,
+            "no_cpufreq": [
+                cpu for cpu in online_cpus if cpu not in cpu_governor]}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
+
+        if bad_policies:
             self.status[check] = False
             self.output[check] = "The scaling governor of one or more CPUs " \
                 "is not set to 'performance'. You can set the scaling " \
                 "governor to 'performance' with 'cpupower frequency-set " \
                 "-g performance' or 'cpufreq-set -r -g performance' " \
                 f"(Debian/Ubuntu). See also {self.wiki_url}{wiki_anchor}"
+            self.remediation[check] = "cpupower frequency-set -g performance"
+        elif slow_policies:
+            self.status[check] = False
+            self.output[check] = "The scaling governor of all CPUs is set " \
+                "to performance, but one or more CPUs ran at less than " \
+                "half their maximum frequency while sampling. Check the " \
+                "energy performance preference and firmware power " \
+                f"settings. See also {self.wiki_url}{wiki_anchor}"
+            self.remediation[check] = "Set the energy performance " \
+                "preference to 'performance' and check the BIOS power " \
+                "profile."
         else:
             self.status[check] = True
             self.output[check] = "The scaling governor of all CPUs is set " \
                 "to performance."
 
+        if cpu_list:
+            self.output[check] += "\n" + "\n".join(cpu_list)
+
         self.format_output(check)
 
+    def sample_frequencies(self, policy_dir, policies, samples=5):
+        totals = dict.fromkeys(policies, 0)
+        counts = dict.fromkeys(policies, 0)
+
+        for sample in range(samples):
+            if sample:
+                time.sleep(self.freq_window / (samples - 1))
+
+            for policy in policies:
+                cur_freq = self.sysroot.read_line(
+                    f"{policy_dir}/{policy}/scaling_cur_freq")
+
+                if cur_freq and cur_freq.isdigit():
+                    totals[policy] += int(cur_freq)
+                    counts[policy] += 1
+
+        for policy, info in policies.items():
+            if counts[policy]:
+                info["cur_freq"] = totals[policy] // counts[policy]
+
+    @check("smt", "Simultaneous Multithreading", consumes=["cpu_smt"],
+           severity="low")
     def smt_check(self):
         check = "smt"
-        self.headline[check] = "Simultaneous Multithreading"
         wiki_anchor = "#simultaneous_multithreading"
+        self.values[check] = {"smt_active": self.cpu_smt}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
 
-        if not self.cpu_smt:
+        if self.cpu_smt == "1":
             self.status[check] = False
             self.output[check] = "Simultaneous Multithreading (SMT, also " \
                 "called hyper-threading) is enabled. This can cause spikes " \
@@ -139,6 +429,8 @@ class Rtcqs:
                 "when experiencing such spikes with 'echo off | sudo tee " \
                 "/sys/devices/system/cpu/smt/control'. See also" \
                 f"{self.wiki_url}{wiki_anchor}"
+            self.remediation[check] = "echo off | sudo tee " \
+                "/sys/devices/system/cpu/smt/control"
         else:
             self.status[check] = True
             self.output[check] = "Simultaneaous Multithreading (SMT, also " \
@@ -146,65 +438,170 @@ class Rtcqs:
 
         self.format_output(check)
 
+    @check("kernel_config", "Kernel Configuration", produces=["kernel"],
+           severity="low")
     def kernel_config_check(self):
         check = "kernel_config"
-        self.headline[check] = "Kernel Configuration"
-        self.kernel["release"] = os.uname().release
+        self.kernel["release"] = self.sysroot.release()
+        self.kernel["config"] = KernelConfig()
+        config_paths = [
+            ("/proc/config.gz", True),
+            (f"/boot/config-{self.kernel['release']}", False)]
 
-        with open("/proc/cmdline", "r") as f:
-            self.kernel["cmdline"] = f.readline().strip().split()
+        with self.sysroot.open("/proc/cmdline", "r") as f:
+            self.kernel["cmdline"] = KernelCmdline.parse(f.readline())
+
+        for config_path, compressed in config_paths:
+            if not self.sysroot.exists(config_path):
+                continue
 
-        if os.path.exists("/proc/config.gz"):
-            self.status[check] = True
-            self.output[check] = "Valid kernel configuration found."
-            with gzip.open("/proc/config.gz", "r") as f:
-                self.kernel["config"] = [
-                    line.strip().decode() for line in f.readlines()]
-        elif os.path.exists(f"/boot/config-{self.kernel['release']}"):
             self.status[check] = True
             self.output[check] = "Valid kernel configuration found."
-            with open(f"/boot/config-{self.kernel['release']}", "r") as f:
-                self.kernel["config"] = [
-                    line.strip() for line in f.readlines()]
+
+            if self.use_cache and self.sysroot.cacheable:
+                self.kernel["config"] = KernelConfigCache().load(
+                    self.kernel["release"], config_path, compressed,
+                    self.sysroot.open)
+            else:
+                with self.sysroot.open(config_path, "rb") as f:
+                    self.kernel["config"] = KernelConfig.from_file(
+                        f, compressed)
+            break
         else:
             self.status[check] = False
             self.output[check] = "Could not find kernel configuration."
 
+        self.values[check] = {
+            "release": self.kernel["release"],
+            "cmdline": self.kernel["cmdline"].tokens,
+            "config_symbols": len(self.kernel["config"])}
+
         self.format_output(check)
 
+    @check("high_res_timers", "High Resolution Timers", consumes=["kernel"])
     def high_res_timers_check(self):
         check = "high_res_timers"
-        self.headline[check] = "High Resolution Timers"
         wiki_anchor = "#installing_a_real-time_kernel"
 
-        if "CONFIG_HIGH_RES_TIMERS=y" not in self.kernel["config"]:
+        self.values[check] = {
+            "CONFIG_HIGH_RES_TIMERS": self.kernel["config"].value(
+                "HIGH_RES_TIMERS")}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
+
+        if not self.kernel["config"].is_builtin("HIGH_RES_TIMERS"):
             self.status[check] = False
             self.output[check] = "High resolution timers are not " \
                 "enabled. Try enabling high-resolution timers " \
                 "(CONFIG_HIGH_RES_TIMERS) under 'Processor type and " \
                 f"features'). See also: {self.wiki_url}{wiki_anchor}"
+            self.remediation[check] = "Build the kernel with " \
+                "CONFIG_HIGH_RES_TIMERS=y."
         else:
             self.status[check] = True
             self.output[check] = "High resolution timers are enabled."
 
         self.format_output(check)
 
+    @check("system_timer", "System Timer", produces=["clocksource"],
+           consumes=["kernel", "cpu_online"])
+    def system_timer_check(self):
+        check = "system_timer"
+        wiki_anchor = "#installing_a_real-time_kernel"
+        source_dir = "/sys/devices/system/clocksource/clocksource0"
+        current = self.clocksource = self.sysroot.read_line(
+            f"{source_dir}/current_clocksource")
+        available = self.sysroot.read_line(
+            f"{source_dir}/available_clocksource", "").split()
+        hz = self.kernel["config"].value("HZ")
+        clock_costs = {}
+        warnings = []
+
+        if self.sysroot.name == "live":
+            from rtcqs.clocks import measure_clocks
+
+            for cpu, results in measure_clocks(self.cpu_online, 200).items():
+                for clock, result in results.items():
+                    cost = clock_costs.setdefault(clock, {
+                        "ns_per_call": 0, "max_step_ns": 0, "backwards": 0,
+                        "slow_cpus": []})
+                    cost["ns_per_call"] = max(
+                        cost["ns_per_call"], round(result["ns_per_call"]))
+                    cost["max_step_ns"] = max(
+                        cost["max_step_ns"], result["max_step_ns"])
+                    cost["backwards"] += result["backwards"]
+
+                    if result["ns_per_call"] > SLOW_CALL_NS:
+                        cost["slow_cpus"].append(cpu)
+
+        self.values[check] = {
+            "current_clocksource": current,
+            "available_clocksource": available,
+            "CONFIG_HZ": hz,
+            "clocks": clock_costs}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
+
+        if current in SLOW_CLOCKSOURCES:
+            warnings.append(
+                f"The kernel uses the {current} clocksource, every timestamp "
+                "and timer wakeup has to read slow hardware.")
+
+            if "tsc" in available:
+                self.remediation[check] = "Switch to the TSC with 'echo " \
+                    f"tsc | sudo tee {source_dir}/current_clocksource' and " \
+                    "add 'clocksource=tsc' to the kernel command line."
+            else:
+                self.remediation[check] = "Check 'dmesg | grep -i " \
+                    "clocksource' for why the TSC was marked unstable, " \
+                    "e.g. after a firmware update."
+
+        for clock, cost in sorted(clock_costs.items()):
+            if cost["slow_cpus"]:
+                warnings.append(
+                    f"Reading {clock} takes up to {cost['ns_per_call']} ns on "
+                    f"CPUs {format_cpu_list(cost['slow_cpus'])}.")
+
+            if cost["backwards"]:
+                warnings.append(
+                    f"{clock} went backwards {cost['backwards']} time(s) "
+                    "while reading it on one CPU.")
+
+        if hz is not None and int(hz) < 250:
+            warnings.append(
+                f"CONFIG_HZ is set to {hz}, the scheduler tick only runs "
+                f"every {1000 // int(hz)} ms.")
+            self.remediation.setdefault(
+                check, "Use a kernel built with CONFIG_HZ_1000=y.")
+
+        summary = [f"Clocksource {current or 'unknown'} (available: "
+                   f"{', '.join(available) or 'unknown'}), CONFIG_HZ "
+                   f"{hz or 'unknown'}."]
+        summary += [
+            f"{clock}: {cost['ns_per_call']} ns per call, max step "
+            f"{cost['max_step_ns'] / 1000:.1f} us."
+            for clock, cost in sorted(clock_costs.items())]
+
+        if warnings:
+            self.status[check] = False
+            self.output[check] = "\n".join(warnings + summary)
+        else:
+            self.status[check] = True
+            self.output[check] = "\n".join(summary)
+
+        self.format_output(check)
+
+    @check("tickless", "Tickless Kernel", consumes=["kernel"])
     def tickless_check(self):
         check = "tickless"
-        self.headline[check] = "Tickless Kernel"
         wiki_anchor = "#installing_a_real-time_kernel"
-        conf_nohz_list = [
-            "CONFIG_NO_HZ=y",
-            "CONFIG_NO_HZ_IDLE=y",
-            "CONFIG_NO_HZ_COMMON=y",
-            "CONFIG_NO_HZ_FULL=y"]
-
-        conf_nohz_match = [
-            match for match in conf_nohz_list if match in
-            self.kernel["config"]]
-
-        if int(len(conf_nohz_match)) > 0 or \
-                os.path.exists("/sys/devices/system/cpu/nohz_full"):
+        conf_nohz_list = ["NO_HZ", "NO_HZ_IDLE", "NO_HZ_COMMON", "NO_HZ_FULL"]
+        self.values[check] = {
+            f"CONFIG_{conf_nohz}": self.kernel["config"].value(conf_nohz)
+            for conf_nohz in conf_nohz_list}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
+
+        if any(self.kernel["config"].is_builtin(conf_nohz)
+               for conf_nohz in conf_nohz_list) or \
+                self.sysroot.exists("/sys/devices/system/cpu/nohz_full"):
             self.status[check] = True
             self.output[check] = "System is using a tickless kernel."
         else:
@@ -213,28 +610,35 @@ class Rtcqs:
                 "enabling tickless timer support (CONFIG_NO_HZ_IDLE, or " \
                 "CONFIG_NO_HZ in older kernels). See also " \
                 f"{self.wiki_url}{wiki_anchor}"
+            self.remediation[check] = "Build the kernel with " \
+                "CONFIG_NO_HZ_IDLE=y."
 
         self.format_output(check)
 
+    @check("preempt_rt", "Preempt RT", consumes=["kernel"])
     def preempt_rt_check(self):
         check = "preempt_rt"
-        self.headline[check] = "Preempt RT"
         wiki_anchor = "#do_i_really_need_a_real-time_kernel"
         threadirqs = preempt = False
 
         if "threadirqs" in self.kernel["cmdline"]:
             threadirqs = True
 
-        if "CONFIG_PREEMPT_RT=y" in self.kernel["config"] or \
-                "CONFIG_PREEMPT_RT_FULL=y" in self.kernel["config"] or \
+        if self.kernel["config"].is_builtin("PREEMPT_RT") or \
+                self.kernel["config"].is_builtin("PREEMPT_RT_FULL") or \
                 "preempt=full" in self.kernel["cmdline"]:
             preempt = True
 
+        self.values[check] = {"threadirqs": threadirqs, "preempt": preempt}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
+
         if not threadirqs and not preempt:
             self.status[check] = False
             self.output[check] = f"Kernel {self.kernel['release']} without " \
                 "'threadirqs' parameter or real-time capabilities found. " \
                 f"See also {self.wiki_url}{wiki_anchor}"
+            self.remediation[check] = "Add 'threadirqs' to the kernel " \
+                "command line or install a real-time kernel."
         elif threadirqs:
             self.status[check] = True
             self.output[check] = f"Kernel {self.kernel['release']} is using " \
@@ -246,10 +650,14 @@ class Rtcqs:
 
         self.format_output(check)
 
+    @check("mitigations", "Spectre/Meltdown Mitigations",
+           consumes=["kernel"], severity="low")
     def mitigations_check(self):
         check = "mitigations"
-        self.headline[check] = "Spectre/Meltdown Mitigations"
         wiki_anchor = "#disabling_spectre_and_meltdown_mitigations"
+        self.values[check] = {
+            "mitigations_off": "mitigations=off" in self.kernel["cmdline"]}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
 
         if "mitigations=off" not in self.kernel["cmdline"]:
             self.status[check] = False
@@ -257,6 +665,8 @@ class Rtcqs:
                 "found. This could have a negative impact on the " \
                 "performance of your system. See also " \
                 f"{self.wiki_url}{wiki_anchor}"
+            self.remediation[check] = "Add 'mitigations=off' to the kernel " \
+                "command line."
         else:
             self.status[check] = True
             self.output[check] = "Spectre/Meltdown mitigations are " \
@@ -265,32 +675,38 @@ class Rtcqs:
 
         self.format_output(check)
 
+    @check("rt_prio", "RT Priorities", severity="high")
     def rt_prio_check(self):
         check = "rt_prio"
-        self.headline[check] = "RT Priorities"
         wiki_anchor = "#limitsconfaudioconf"
-        param = os.sched_param(80)
         sched = os.SCHED_FIFO
+        self.values[check] = {"priority": 80, "error": None}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
 
         try:
-            os.sched_setscheduler(0, sched, param)
+            self.sysroot.set_scheduler(sched, 80)
         except PermissionError as e:
+            self.values[check]["error"] = str(e)
             self.status[check] = False
             self.output[check] = "Could not assign a 80 rtprio SCHED_FIFO " \
                 f"value due to the following error: {e}. Set up " \
                 f"imits.conf. See also {self.wiki_url}{wiki_anchor}"
+            self.remediation[check] = "Allow your group an rtprio of at " \
+                "least 80 in /etc/security/limits.d/."
         else:
             self.status[check] = True
             self.output[check] = "Realtime priorities can be set."
 
         self.format_output(check)
 
+    @check("swappiness", "Swappiness")
     def swappiness_check(self):
         check = "swappiness"
-        self.headline[check] = "Swappiness"
         wiki_anchor = "#sysctlconf"
+        self.values[check] = {"swap": False, "swappiness": None}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
 
-        with open("/proc/swaps", "r") as f:
+        with self.sysroot.open("/proc/swaps", "r") as f:
             lines = f.readlines()
 
         if len(lines) < 2:
@@ -302,24 +718,117 @@ class Rtcqs:
             swap = True
 
         if swap:
-            with open("/proc/sys/vm/swappiness", "r") as f:
+            with self.sysroot.open("/proc/sys/vm/swappiness", "r") as f:
                 swappiness = int(f.readline().strip())
 
+            self.values[check] = {"swap": True, "swappiness": swappiness}
+
             if swappiness > 10:
                 self.status[check] = False
                 self.output[check] = f"vm.swappiness is set to {swappiness} " \
                     "which is too high. Set swappiness to a lower value by " \
                     "adding 'vm.swappiness=10' to /etc/sysctl.conf and run " \
                     f"'sysctl --system'. See also {self.wiki_url}{wiki_anchor}"
+                self.remediation[check] = "Add 'vm.swappiness=10' to " \
+                    "/etc/sysctl.conf and run 'sysctl --system'."
             else:
                 self.status[check] = True
                 self.output[check] = f"Swappiness is set at {swappiness}."
 
         self.format_output(check)
 
+    @check("memory", "Memory Latency")
+    def memory_check(self):
+        check = "memory"
+        thp_dir = "/sys/kernel/mm/transparent_hugepage"
+        vm_dir = "/proc/sys/vm"
+        mem_total = None
+        warnings = []
+
+        try:
+            with self.sysroot.open("/proc/meminfo", "r") as f:
+                for line in f:
+                    if line.startswith("MemTotal:"):
+                        mem_total = int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            pass
+
+        thp = {}
+
+        for setting in ("enabled", "defrag"):
+            modes = self.sysroot.read_line(f"{thp_dir}/{setting}")
+            thp[setting] = modes.partition("[")[2].partition("]")[0] \
+                if modes and "[" in modes else modes
+
+        vm = {
+            setting: self.sysroot.read_line(f"{vm_dir}/{setting}")
+            for setting in (
+                "compaction_proactiveness", "dirty_ratio", "dirty_bytes",
+                "dirty_background_ratio", "dirty_background_bytes",
+                "dirty_expire_centisecs", "dirty_writeback_centisecs")}
+
+        if vm["dirty_bytes"] not in (None, "0"):
+            dirty_limit = int(vm["dirty_bytes"])
+        elif vm["dirty_ratio"] is not None and mem_total:
+            dirty_limit = mem_total * int(vm["dirty_ratio"]) // 100
+        else:
+            dirty_limit = None
+
+        try:
+            zram = [
+                device for device in self.sysroot.listdir("/sys/block")
+                if device.startswith("zram")]
+        except OSError:
+            zram = []
+
+        zswap = self.sysroot.read_line("/sys/module/zswap/parameters/enabled")
+        self.values[check] = {
+            "mem_total": mem_total,
+            "thp_enabled": thp["enabled"],
+            "thp_defrag": thp["defrag"],
+            "vm": vm,
+            "dirty_limit": dirty_limit,
+            "zswap": zswap in ("Y", "1"),
+            "zram": zram}
+
+        if thp["enabled"] == "always":
+            warnings.append(
+                "Transparent hugepages are always enabled, khugepaged and "
+                "huge page faults can stall audio threads.")
+
+        if thp["defrag"] == "always":
+            warnings.append(
+                "Transparent hugepage defrag is set to 'always', page "
+                "faults can stall on direct compaction.")
+
+        if dirty_limit is not None and dirty_limit > 2 << 30:
+            warnings.append(
+                f"Up to {dirty_limit >> 20} MiB of dirty pages can build up "
+                "before writeback, large writeback bursts can stall I/O.")
+
+        summary = f"{(mem_total or 0) >> 20} MiB RAM, transparent " \
+            f"hugepages {thp['enabled']} (defrag {thp['defrag']}), " \
+            f"compaction proactiveness {vm['compaction_proactiveness']}, " \
+            f"zswap {'on' if self.values[check]['zswap'] else 'off'}, " \
+            f"{len(zram)} zram device(s)."
+
+        if warnings:
+            self.status[check] = False
+            self.output[check] = "\n".join(warnings + [summary])
+            self.remediation[check] = "Set transparent hugepages and their " \
+                "defrag to 'madvise' and vm.dirty_bytes to a few hundred MiB."
+        else:
+            self.status[check] = True
+            self.output[check] = summary
+
+        self.format_output(check)
+
+    @check("filesystems", "Filesystems", severity="low")
     def filesystems_check(self):
+        from rtcqs.mounts import read_mounts
+
         check = "filesystems"
-        self.headline[check] = "Filesystems"
         wiki_anchor = "#filesystems"
         good_fs = ["ext4", "xfs", "zfs", "btrfs"]
         bad_fs = ["fuse", "reiserfs", "nfs", "cifs"]
@@ -327,116 +836,391 @@ class Rtcqs:
         ignore_mounts = ["/run"]
         good_mounts_list = []
         bad_mounts_list = []
+        good_mounts_info = []
+        devices = {}
 
-        with open("/proc/mounts", "r") as f:
-            mounts = [line.split() for line in f.readlines()]
-
-        for mount in mounts:
-            mount_split = mount[2].split(".")[0]
-            mount_point = mount[1]
+        for mount in read_mounts(self.sysroot):
+            mount_split = mount.fstype.split(".")[0]
+            mount_point = mount.mount_point
             mount_top_dir = f"/{mount_point.split('/')[1]}"
             if mount_split in good_fs and mount_point not in bad_mounts:
                 good_mounts_list.append(mount_point)
+                device = mount.device
+
+                if device is None:
+                    good_mounts_info.append(mount_point)
+                    continue
+
+                devices[device.name] = {
+                    "scheduler": device.scheduler,
+                    "rotational": device.rotational,
+                    "nr_requests": device.nr_requests}
+                good_mounts_info.append(
+                    f"{mount_point} ({mount.fstype} on {device.name}, "
+                    f"{device.kind}, scheduler {device.scheduler})")
             elif (mount_split in bad_fs or mount_point in bad_mounts) and \
                     mount_top_dir not in ignore_mounts:
                 bad_mounts_list.append(mount_point)
 
+        self.values[check] = {
+            "good_mounts": good_mounts_list, "bad_mounts": bad_mounts_list,
+            "devices": devices}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
+        self.status[check] = True
+        output_list = []
+
         self.print_cli(self.headline[check])
         self.print_cli("===========")
 
         if len(good_mounts_list) > 0:
-            good_mounts = ", ".join(good_mounts_list)
-            self.status[check] = True
-            self.output[check] = "The following mounts can be used for " \
-                f"audio purposes: {good_mounts}"
-            self.print_status('filesystems')
-            self.print_cli(self.output['filesystems'])
+            good_mounts = ", ".join(good_mounts_info)
+            output_list.append(
+                "The following mounts can be used for audio purposes: "
+                f"{good_mounts}")
+            self.print_status(check)
+            self.print_cli(output_list[-1])
 
         if len(bad_mounts_list) > 0:
             bad_mounts = ', '.join(bad_mounts_list)
             self.status[check] = False
-            self.output[check] = "The following mounts should be avoided " \
-                f"for audio purposes: {bad_mounts}. See also " \
-                f"{self.wiki_url}{wiki_anchor}"
+            output_list.append(
+                "The following mounts should be avoided for audio purposes: "
+                f"{bad_mounts}. See also {self.wiki_url}{wiki_anchor}")
+            self.remediation[check] = "Keep audio projects and sample " \
+                "libraries on ext4, xfs, zfs or btrfs mounts."
             self.print_status(check)
-            self.print_cli(self.output[check])
+            self.print_cli(output_list[-1])
 
+        self.output[check] = "\n".join(output_list)
         self.print_cli("")
 
+    @check("irqs", "IRQs", produces=["irq_inventory"], severity="high")
     def irq_check(self):
+        from rtcqs.irqs import IrqInventory
+
         check = "irqs"
-        self.headline[check] = "IRQs"
         bad_irq_list = []
         good_irq_list = []
-        snd_list = ["audiodsp", "snd_.*"]
-        snd_re = "|".join(snd_list)
-        usb_re = "[e,u,x]hci_hcd"
-        snd_compiled_re = re.compile(snd_re)
-        usb_compiled_re = re.compile(usb_re)
-        output_irq = {}
-        irq_path = "/sys/kernel/irq"
-        irq_path_list = os.listdir(irq_path)
-
-        for irq in irq_path_list:
-            with open(f"{irq_path}/{irq}/actions", "r") as f:
-                devices = f.readline().strip()
-
-            device_list = devices.split(", ")
-
-            if snd_compiled_re.search(devices):
-                if len(device_list) > 1:
-                    bad_irq_list.append(irq)
-                    self.status["snd_irqs"] = False
-                    output_irq[irq] = f"Soundcard {device_list[0]} with IRQ " \
-                        f"{irq} shares its IRQ with the following other " \
-                        f"devices {devices}"
-                else:
-                    good_irq_list.append(irq)
-                    self.status["snd_irqs"] = True
-                    output_irq[irq] = f"Soundcard {device_list[0]} with IRQ " \
-                        f"{irq} does not share its IRQ."
-            if usb_compiled_re.search(devices):
-                if len(device_list) > 1:
-                    bad_irq_list.append(irq)
-                    self.status["usb_irqs"] = False
-                    output_irq[irq] = f"Found USB port {device_list[0]} " \
-                        f"with IRQ {irq} that shares its IRQ with the " \
-                        f"following other devices: {devices}"
-                else:
-                    good_irq_list.append(irq)
-                    self.status["usb_irqs"] = True
-                    output_irq[irq] = f"USB port {device_list[0]} with IRQ " \
-                        f"{irq} does not share its IRQ."
+        output_irq = []
+        inventory = self.irq_inventory = IrqInventory.read(self.sysroot)
+        snd_irqs = inventory.sound()
+        usb_irqs = inventory.usb()
+
+        for irq in snd_irqs:
+            if irq.shared:
+                bad_irq_list.append(irq.irq)
+                self.status["snd_irqs"] = False
+                output_irq.append((False, f"Soundcard {irq.actions[0]} with "
+                                   f"IRQ {irq.irq} shares its IRQ with the "
+                                   "following other devices "
+                                   f"{irq.devices}"))
+            else:
+                good_irq_list.append(irq.irq)
+                self.status["snd_irqs"] = True
+                output_irq.append((True, f"Soundcard {irq.actions[0]} with "
+                                   f"IRQ {irq.irq} does not share its IRQ."))
+
+        for irq in usb_irqs:
+            if irq.shared:
+                bad_irq_list.append(irq.irq)
+                self.status["usb_irqs"] = False
+                output_irq.append((False, f"Found USB port {irq.actions[0]} "
+                                   f"with IRQ {irq.irq} that shares its IRQ "
+                                   "with the following other devices: "
+                                   f"{irq.devices}"))
+            else:
+                good_irq_list.append(irq.irq)
+                self.status["usb_irqs"] = True
+                output_irq.append((True, f"USB port {irq.actions[0]} with "
+                                   f"IRQ {irq.irq} does not share its IRQ."))
+
+        output_irq.sort(key=lambda item: not item[0])
+        self.values[check] = {
+            "snd_irqs": {irq.irq: irq.actions for irq in snd_irqs},
+            "usb_irqs": {irq.irq: irq.actions for irq in usb_irqs},
+            "shared_irqs": sorted(set(bad_irq_list))}
+        self.status[check] = len(bad_irq_list) == 0
+        self.output[check] = "\n".join(output for _, output in output_irq)
+
+        if bad_irq_list:
+            self.remediation[check] = "Move the sound card or USB " \
+                "controller to an IRQ it does not share, e.g. by using " \
+                "another port or slot."
 
         self.print_cli(self.headline[check])
         self.print_cli("====")
 
-        if len(good_irq_list) > 0:
+        for status, output in output_irq:
+            self.print_status(check, status)
+            self.print_cli(output)
+
+        self.print_cli("")
+
+    @check("irq_threads", "IRQ Thread Priorities",
+           consumes=["irq_inventory", "kernel"])
+    def irq_threads_check(self):
+        check = "irq_threads"
+        inventory = self.irq_inventory
+        audio_irqs = {irq.irq: "usb" for irq in inventory.usb()}
+        audio_irqs.update({irq.irq: "sound" for irq in inventory.sound()})
+        ladder = []
+        processes = 0
+
+        for stat in iter_processes(self.sysroot):
+            processes += 1
+
+            if stat.ppid != 2 or not stat.comm.startswith("irq/"):
+                continue
+
+            irq, _, name = stat.comm[4:].partition("-")
+
+            if not irq.isdigit():
+                continue
+
+            irq = int(irq)
+            irq_info = inventory.irqs.get(irq)
+            ladder.append({
+                "pid": stat.pid,
+                "irq": irq,
+                "name": irq_info.devices if irq_info else name,
+                "role": audio_irqs.get(irq, "other"),
+                "policy": stat.policy_name,
+                "priority": stat.rt_priority if stat.realtime else 0,
+                "affinity": None})
+
+        ladder.sort(key=lambda thread: (-thread["priority"], thread["irq"]))
+        sound = [thread for thread in ladder if thread["role"] == "sound"]
+        audio = sound or [thread for thread in ladder
+                          if thread["role"] == "usb"]
+        floor = min((thread["priority"] for thread in audio), default=None)
+        inversions = [
+            thread for thread in ladder
+            if thread["role"] == "other" and floor is not None and
+            thread["priority"] >= floor]
+
+        for thread in audio + inversions:
+            affinity_path = f"/proc/irq/{thread['irq']}/smp_affinity_list"
+
+            try:
+                with self.sysroot.open(affinity_path, "r") as f:
+                    thread["affinity"] = f.readline().strip()
+            except OSError:
+                pass
+
+        self.values[check] = {"ladder": ladder, "inversions": [
+            thread["irq"] for thread in inversions]}
+
+        if not processes:
             self.status[check] = True
-            self.output[check] = "\n".join(
-                [output_irq[good_irq] for good_irq in good_irq_list])
+            self.output[check] = "Process data is unavailable, IRQ thread " \
+                "priorities could not be audited."
+        elif not ladder:
+            self.status[check] = True
+            self.output[check] = f"Kernel {self.kernel['release']} has no " \
+                "IRQ threads, there are no IRQ thread priorities to audit."
+        elif not audio:
+            self.status[check] = True
+            self.output[check] = "No IRQ threads of sound cards or USB " \
+                "controllers found."
+        else:
+            lines = [
+                f"IRQ {thread['irq']} ({thread['name']}) thread runs at "
+                f"{thread['policy']} priority {thread['priority']} on CPUs "
+                f"{thread['affinity'] or 'unknown'}." for thread in audio]
 
-            for good_irq in good_irq_list:
-                self.print_status(check)
-                self.print_cli(output_irq[good_irq])
+            if inversions:
+                self.status[check] = False
+                lines += [
+                    f"IRQ {thread['irq']} ({thread['name']}) thread runs at "
+                    f"priority {thread['priority']} on CPUs "
+                    f"{thread['affinity'] or 'unknown'}, not below the audio "
+                    "IRQ threads."
+                    for thread in inversions]
+                self.remediation[check] = "Raise the priority of the " \
+                    "sound card IRQ threads above all other IRQ threads, " \
+                    "e.g. with rtirq or 'chrt -f -p 90 <pid>'."
+            else:
+                self.status[check] = True
 
-        if len(bad_irq_list) > 0:
-            self.status[check] = False
-            self.output[check] = "\n".join(
-                [output_irq[bad_irq] for bad_irq in bad_irq_list])
+            self.output[check] = "\n".join(lines)
 
-            for bad_irq in bad_irq_list:
-                self.print_status(check)
-                self.print_cli(output_irq[bad_irq])
+        self.format_output(check)
 
-        self.print_cli("")
+    @check("cpu_isolation", "CPU Isolation",
+           consumes=["kernel", "cpu_online", "irq_inventory"])
+    def cpu_isolation_check(self):
+        check = "cpu_isolation"
+        cpu_dir = "/sys/devices/system/cpu"
+        cmdline = self.kernel["cmdline"]
+        inventory = self.irq_inventory
+        online = cpu_bits(self.cpu_online)
+        last_cpu = max(self.cpu_online, default=0)
+        warnings = []
+
+        requested = {}
+
+        for param in ("isolcpus", "nohz_full", "rcu_nocbs", "irqaffinity"):
+            try:
+                requested[param] = cmdline.cpu_bits(param, last_cpu)
+            except ValueError:
+                requested[param] = None
+                warnings.append(
+                    f"{param}={cmdline.get(param)} is not a valid CPU list.")
+
+        isolated = requested["isolcpus"] or 0
+        nohz_full = requested["nohz_full"] or 0
+
+        if "domain" not in cmdline.isolcpus_flags():
+            isolated = 0
+
+        sysfs_isolated = self.sysroot.read_line(f"{cpu_dir}/isolated")
+        sysfs_nohz_full = self.sysroot.read_line(f"{cpu_dir}/nohz_full")
+
+        try:
+            if sysfs_isolated is not None:
+                isolated = cpu_bits(parse_cpu_list(sysfs_isolated))
+
+            if sysfs_nohz_full is not None:
+                nohz_full = cpu_bits(parse_cpu_list(
+                    sysfs_nohz_full.replace("(null)", "")))
+        except ValueError:
+            warnings.append(
+                f"{cpu_dir}/isolated or nohz_full holds a malformed CPU list.")
+
+        rcu_nocbs = (requested["rcu_nocbs"] or 0) | nohz_full
+        default_affinity = self.sysroot.read_line(
+            "/proc/irq/default_smp_affinity")
+        irq_affinity = requested["irqaffinity"]
+
+        if default_affinity is not None:
+            irq_affinity = parse_cpu_mask(default_affinity) & online
+        elif irq_affinity is None:
+            irq_affinity = online
+
+        reserved = isolated | nohz_full
+        housekeeping = online & ~reserved
+        candidates = bits_cpus(online & isolated & nohz_full)
+        noisy = {}
+        audio_irqs = {}
+
+        if inventory is not None:
+            audio = {irq.irq for irq in inventory.sound() + inventory.usb()}
+            index = {cpu: i for i, cpu in enumerate(inventory.cpus)}
+            columns = [
+                (cpu, index[cpu]) for cpu in candidates if cpu in index]
+
+            for irq in inventory.irqs.values():
+                if irq.irq in audio:
+                    audio_irqs[irq.irq] = inventory.serving_cpus(irq.irq)
+                    continue
+
+                for cpu, column in columns:
+                    if irq.counts[column]:
+                        noisy.setdefault(cpu, []).append(irq.irq)
+
+        quiet = cpu_bits(candidates) & ~cpu_bits(noisy)
+
+        for param in ("isolcpus", "nohz_full", "rcu_nocbs", "irqaffinity"):
+            offline = bits_cpus((requested[param] or 0) & ~online)
+
+            if offline:
+                warnings.append(
+                    f"{param}= names CPUs {format_cpu_list(offline)} that "
+                    "are not online.")
+
+        if reserved and not housekeeping:
+            warnings.append(
+                "No online CPU is left for housekeeping, all of them are "
+                "isolated or run without a tick.")
+
+        if isolated & ~nohz_full:
+            warnings.append(
+                "Isolated CPUs "
+                f"{format_cpu_list(bits_cpus(isolated & ~nohz_full))} still "
+                "take the scheduler tick, they are missing from nohz_full=.")
+
+        if nohz_full & ~isolated:
+            warnings.append(
+                "CPUs "
+                f"{format_cpu_list(bits_cpus(nohz_full & ~isolated))} run "
+                "without a tick but are not isolated, the scheduler keeps "
+                "balancing other tasks onto them.")
+
+        if reserved and irq_affinity & reserved:
+            warnings.append(
+                "The default IRQ affinity includes isolated or tickless CPUs "
+                f"{format_cpu_list(bits_cpus(irq_affinity & reserved))}, new "
+                "device IRQs can land on them.")
+
+        for cpu, irqs in sorted(noisy.items()):
+            warnings.append(
+                f"CPU {cpu} is isolated but has served device IRQs "
+                f"{', '.join(map(str, irqs[:5]))}"
+                f"{' and more' if len(irqs) > 5 else ''}.")
+
+        self.values[check] = {
+            "isolcpus": format_cpu_list(bits_cpus(isolated)),
+            "isolcpus_flags": sorted(cmdline.isolcpus_flags()),
+            "nohz_full": format_cpu_list(bits_cpus(nohz_full)),
+            "rcu_nocbs": format_cpu_list(bits_cpus(rcu_nocbs)),
+            "irq_affinity": format_cpu_list(bits_cpus(irq_affinity)),
+            "housekeeping": format_cpu_list(bits_cpus(housekeeping)),
+            "quiet": format_cpu_list(bits_cpus(quiet)),
+            "noisy": noisy,
+            "audio_irqs": {
+                irq: format_cpu_list(cpus)
+                for irq, cpus in audio_irqs.items()}}
+
+        if quiet:
+            summary = [
+                f"CPUs {format_cpu_list(bits_cpus(quiet))} are quiet for "
+                "audio threads, housekeeping runs on CPUs "
+                f"{format_cpu_list(bits_cpus(housekeeping))}."]
+        elif candidates:
+            summary = [
+                "No CPU is quiet for audio threads, device IRQs fire on all "
+                "isolated CPUs."]
+        else:
+            summary = [
+                "No CPU is quiet for audio threads, they share all CPUs with "
+                "the rest of the system."]
+
+        for irq, cpus in sorted(audio_irqs.items()):
+            if cpus:
+                summary.append(
+                    f"IRQ {irq} ({inventory.irqs[irq].devices}) fires on "
+                    f"CPUs {format_cpu_list(cpus)}.")
+
+        if warnings:
+            self.status[check] = False
+            self.output[check] = "\n".join(warnings + summary)
+            cpus = format_cpu_list(bits_cpus(reserved & online))
+            self.remediation[check] = "Give isolcpus=, nohz_full= and " \
+                "rcu_nocbs= the same online CPUs and point irqaffinity= at " \
+                "the others"
+
+            if cpus and housekeeping:
+                self.remediation[check] += ", e.g. " \
+                    f"'isolcpus=managed_irq,domain,{cpus} nohz_full={cpus} " \
+                    f"rcu_nocbs={cpus} irqaffinity=" \
+                    f"{format_cpu_list(bits_cpus(housekeeping))}'"
+
+            self.remediation[check] += "."
+        else:
+            self.status[check] = True
+            self.output[check] = "\n".join(summary)
+
+        self.format_output(check)
 
+    @check("power_management", "Power Management")
     def power_management_check(self):
         check = "power_management"
-        self.headline[check] = "Power Management"
         wiki_anchor = "#quality_of_service_interface"
+        writable = self.sysroot.access("/dev/cpu_dma_latency", os.W_OK)
+        self.values[check] = {"cpu_dma_latency_writable": writable}
+        self.urls[check] = f"{self.wiki_url}{wiki_anchor}"
 
-        if os.access("/dev/cpu_dma_latency", os.W_OK):
+        if writable:
             self.status[check] = True
             self.output[check] = "Power management can be controlled from " \
                 "user space. This enables DAWs like Ardour and Reaper to " \
@@ -449,30 +1233,585 @@ class Rtcqs:
                 "Reaper to set CPU DMA latency which could help prevent " \
                 "xruns. For enabling access see " \
                 f"{self.wiki_url}{wiki_anchor}"
+            self.remediation[check] = "Grant your group write access to " \
+                "/dev/cpu_dma_latency with a udev rule."
+
+        self.format_output(check)
+
+    def enable_profiling(self, hooks=()):
+        from rtcqs.instrument import Profiler
+
+        self.profiler = Profiler(hooks)
+        self.sysroot = self.profiler.wrap(self.sysroot)
+        return self.profiler
+
+    def result_dict(self, result):
+        record = result.as_dict()
+
+        if self.profiler and result.id in self.profiler.profiles:
+            record["profile"] = self.profiler.profiles[result.id].as_dict()
+
+        return record
+
+    def add_result(self, spec):
+        result = self.results[spec.name] = CheckResult.from_app(self, spec)
+
+        if self.output_format == "ndjson":
+            import json
+
+            self.write(json.dumps(
+                self.result_dict(result), separators=(",", ":")) + "\n")
+
+        for hook in self.result_hooks:
+            hook(result)
+
+    def print_json(self):
+        import json
+
+        self.write(json.dumps({
+            "version": self.version,
+            "host": self.sysroot.hostname(),
+            "results": [
+                self.result_dict(result)
+                for result in self.results.values()]},
+            indent=2) + "\n")
+
+    @check("cpu_idle", "CPU Idle States", produces=["idle_latency"],
+           consumes=["cpu_online"])
+    def cpu_idle_check(self):
+        check = "cpu_idle"
+        cpu_dir = "/sys/devices/system/cpu"
+        period_us = self.buffer_frames * 1000000 // self.sample_rate
+        profiles = {}
+        too_deep = {}
+        idle_latency = self.idle_latency = {}
+
+        for cpu_nr in self.cpu_online:
+            idle_dir = f"{cpu_dir}/cpu{cpu_nr}/cpuidle"
+
+            try:
+                state_names = sorted(
+                    (state for state in self.sysroot.listdir(idle_dir)
+                     if state.startswith("state")),
+                    key=lambda state: int(state[5:]))
+            except OSError:
+                continue
+
+            states = []
+
+            for state in state_names:
+                state_dir = f"{idle_dir}/{state}"
+                latency = self.sysroot.read_line(f"{state_dir}/latency", "0")
+                residency = self.sysroot.read_line(
+                    f"{state_dir}/residency", "0")
+                states.append((
+                    self.sysroot.read_line(f"{state_dir}/name", state),
+                    int(latency), int(residency),
+                    self.sysroot.read_line(f"{state_dir}/disable") == "1"))
+
+            profiles.setdefault(tuple(states), []).append(cpu_nr)
+            idle_latency[cpu_nr] = max(
+                (latency for _, latency, _, disabled in states
+                 if not disabled), default=0)
+
+            for name, latency, _, disabled in states:
+                if not disabled and latency > period_us:
+                    too_deep.setdefault((name, latency), []).append(cpu_nr)
+
+        worst = max(
+            (latency for states in profiles for _, latency, _, disabled
+             in states if not disabled), default=0)
+        self.values[check] = {
+            "period_us": period_us,
+            "worst_exit_latency_us": worst,
+            "profiles": [
+                {"cpus": format_cpu_list(cpus), "states": [
+                    {"name": name, "latency": latency,
+                     "residency": residency, "disabled": disabled}
+                    for name, latency, residency, disabled in states]}
+                for states, cpus in profiles.items()],
+            "too_deep": [
+                {"name": name, "latency": latency,
+                 "cpus": format_cpu_list(cpus)}
+                for (name, latency), cpus in too_deep.items()]}
+
+        if not profiles:
+            self.status[check] = True
+            self.output[check] = "No CPU idle states found."
+        elif too_deep:
+            self.status[check] = False
+            self.output[check] = "\n".join(
+                [f"The deepest enabled idle state takes {worst} us to exit, "
+                 f"more than the {period_us} us period of "
+                 f"{self.buffer_frames} frames at {self.sample_rate} Hz."] +
+                [f"Idle state {name} ({latency} us) is enabled on CPUs "
+                 f"{format_cpu_list(cpus)}."
+                 for (name, latency), cpus in sorted(too_deep.items())])
+            self.remediation[check] = "Disable the deep idle states with " \
+                f"'cpupower idle-set -D {period_us}' or have the DAW hold " \
+                "/dev/cpu_dma_latency."
+        else:
+            self.status[check] = True
+            self.output[check] = "All enabled idle states exit within " \
+                f"{worst} us, inside the {period_us} us period of " \
+                f"{self.buffer_frames} frames at {self.sample_rate} Hz."
+
+        self.format_output(check)
+
+    @check("alsa", "ALSA Streams", consumes=[
+        "cpu_governor", "idle_latency", "irq_inventory", "clocksource"])
+    def alsa_check(self):
+        from rtcqs.alsa import read_cards, read_streams, card_irqs
+
+        check = "alsa"
+        inventory = self.irq_inventory
+        cards = read_cards(self.sysroot)
+        streams = read_streams(self.sysroot, cards)
+        irqs = {
+            card.number: card_irqs(self.sysroot, card, inventory)
+            for card in cards}
+        slow_governors = sorted(
+            cpu for cpu, governor in self.cpu_governor.items()
+            if governor != "performance")
+        idle_latency = max(self.idle_latency.values(), default=0)
+        lines = []
+        aggressive = []
+
+        for stream in streams:
+            card = stream.card
+            deadline = stream.period_us
+            problems = []
+            lines.append(
+                f"Card {card.number} ({card.name}) {stream.direction} "
+                f"pcm{stream.device} runs {stream.period_size} frames x "
+                f"{stream.periods} at {stream.rate} Hz, a deadline of "
+                f"{deadline:.0f} us per period.")
+
+            if idle_latency > deadline / 10:
+                problems.append(
+                    f"waking a CPU from idle takes up to {idle_latency} us")
+
+            if slow_governors and deadline < 10000:
+                problems.append(
+                    f"CPUs {format_cpu_list(slow_governors)} ramp up their "
+                    "clock on demand")
+
+            for irq in irqs[card.number]:
+                if inventory is not None and irq in inventory.irqs and \
+                        inventory.irqs[irq].shared:
+                    problems.append(
+                        f"IRQ {irq} is shared with "
+                        f"{inventory.irqs[irq].devices}")
+
+            if self.clocksource in SLOW_CLOCKSOURCES:
+                problems.append(
+                    f"timers run on the {self.clocksource} clocksource")
+
+            if problems:
+                aggressive.append(stream)
+                lines.append(
+                    f"Your {stream.period_size}-frame period is too "
+                    "aggressive for this machine: " + ", ".join(problems) +
+                    ".")
+
+        self.values[check] = {
+            "cards": [
+                {"number": card.number, "id": card.id,
+                 "driver": card.driver, "name": card.name,
+                 "irqs": irqs[card.number]} for card in cards],
+            "streams": [stream.as_dict() for stream in streams],
+            "aggressive": [
+                f"card{stream.card.number}/pcm{stream.device}"
+                f"{stream.direction[0]}" for stream in aggressive]}
+
+        if not cards:
+            self.status[check] = True
+            self.output[check] = "No ALSA sound cards found."
+        elif not streams:
+            self.status[check] = True
+            self.output[check] = "\n".join(
+                [f"Card {card.number} ({card.name}) on IRQs "
+                 f"{', '.join(map(str, irqs[card.number])) or 'unknown'}."
+                 for card in cards] +
+                ["No stream is open, run rtcqs while the DAW is playing to "
+                 "compare its period with this machine."])
+        elif aggressive:
+            self.status[check] = False
+            self.output[check] = "\n".join(lines)
+            self.remediation[check] = "Raise the period size in the DAW " \
+                "or fix the governor, idle state and IRQ findings above."
+        else:
+            self.status[check] = True
+            self.output[check] = "\n".join(lines)
 
         self.format_output(check)
 
-    def main(self):
+    def main(self, only=None, skip=None, jobs=4):
+        specs, shown = select(registry(type(self)), only, skip)
         self.print_version()
-        self.root_check()
-        self.audio_group_check()
-        self.governor_check()
-        self.smt_check()
-        self.kernel_config_check()
-        self.high_res_timers_check()
-        self.tickless_check()
-        self.preempt_rt_check()
-        self.mitigations_check()
-        self.rt_prio_check()
-        self.swappiness_check()
-        self.filesystems_check()
-        self.irq_check()
-        self.power_management_check()
+
+        try:
+            CheckScheduler(
+                self, specs, shown, jobs, on_result=self.add_result,
+                profiler=self.profiler).run()
+        finally:
+            self.results = {
+                spec.name: self.results[spec.name] for spec in specs
+                if spec.name in self.results}
+            self.output = {
+                spec.name: self.output[spec.name] for spec in specs
+                if spec.name in self.output and spec.name in shown}
+
+        if self.output_format == "json":
+            self.print_json()
+        elif self.profiler and self.cli_enabled():
+            self.profiler.write_table(sys.stdout)
+
+
+def check_list(value):
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def positive_float(value):
+    number = float(value)
+
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"{value} is not greater than 0")
+
+    return number
+
+
+def add_latency_arguments(parser):
+    parser.add_argument(
+        "--cpus", type=parse_cpu_list,
+        help="CPUs to measure, e.g. 0-3,6 (default: all usable CPUs)")
+    parser.add_argument(
+        "--frames", type=int, default=64, help="period size in frames")
+    parser.add_argument(
+        "--rate", type=int, default=48000, help="sample rate in Hz")
+    parser.add_argument(
+        "--duration", type=positive_float, default=10.0,
+        help="measurement time in seconds")
+    parser.add_argument(
+        "--priority", type=int, default=80,
+        help="SCHED_FIFO priority of the measurement threads")
 
 
 def main():
-    app = Rtcqs()
-    app.main()
+    parser = argparse.ArgumentParser(
+        prog="rtcqs", description="Linux audio performance analyzer")
+    parser.add_argument(
+        "--sysroot", metavar="PATH",
+        help="analyse a snapshot directory or tarball instead of this host")
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="always re-read the kernel configuration instead of using the "
+        "cached copy in $XDG_CACHE_HOME/rtcqs")
+    parser.add_argument(
+        "--only", metavar="CHECKS", type=check_list,
+        help="comma separated list of checks to run")
+    parser.add_argument(
+        "--skip", metavar="CHECKS", type=check_list,
+        help="comma separated list of checks to leave out")
+    parser.add_argument(
+        "--jobs", type=int, default=4,
+        help="number of checks to run concurrently")
+    parser.add_argument(
+        "--freq-window", metavar="SECONDS", type=float, default=0,
+        help="sample the actual CPU frequencies for this many seconds")
+    parser.add_argument(
+        "--process-window", metavar="SECONDS", type=float, default=0,
+        help="sample the CPU usage of processes for this many seconds, "
+        "e.g. 0.5 (default: off)")
+    parser.add_argument(
+        "--buffer-size", metavar="FRAMES", type=int, default=128,
+        help="audio buffer size the checks should budget for")
+    parser.add_argument(
+        "--sample-rate", metavar="HZ", type=int, default=48000,
+        help="audio sample rate the checks should budget for")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="record wall time, CPU time, opens and bytes read per check")
+    parser.add_argument(
+        "--history", action="store_true",
+        help="record this scan in the local history store")
+    parser.add_argument(
+        "--history-file", metavar="PATH",
+        help="history store to use instead of "
+        "$XDG_DATA_HOME/rtcqs/history.sqlite3")
+    parser.add_argument(
+        "--label", help="name the recorded scan, e.g. as a baseline for diff")
+    parser.add_argument(
+        "--format", choices=["text", "json", "ndjson"], default="text",
+        help="output format, ndjson streams one record per check")
+    subparsers = parser.add_subparsers(dest="command")
+    snapshot_parser = subparsers.add_parser(
+        "snapshot", help="capture a snapshot of this host for later analysis")
+    snapshot_parser.add_argument(
+        "output", help="path of the snapshot tarball to write")
+    fleet_parser = subparsers.add_parser(
+        "fleet", help="analyse a directory of host snapshots in parallel")
+    fleet_parser.add_argument(
+        "fleet_dir", help="directory holding one snapshot per host")
+    fleet_parser.add_argument(
+        "-o", "--output", help="write result records to a file")
+    fleet_parser.add_argument(
+        "-j", "--jobs", dest="fleet_jobs", type=int,
+        help="number of worker processes")
+    watch_parser = subparsers.add_parser(
+        "watch", help="keep watching this host and report changed results")
+    watch_parser.add_argument(
+        "--interval", type=float, default=5.0,
+        help="seconds between polls of the watched sources")
+    diff_parser = subparsers.add_parser(
+        "diff", help="scan and show what changed since the last recorded "
+        "scan")
+    diff_parser.add_argument(
+        "--baseline", metavar="LABEL",
+        help="compare with the last scan recorded with this label")
+    history_parser = subparsers.add_parser(
+        "history", help="query the recorded scans of a host")
+    history_parser.add_argument(
+        "--host", help="host to query, default this host")
+    history_parser.add_argument(
+        "--check", help="only show status changes of this check")
+    history_parser.add_argument(
+        "--left", metavar="CHECK.KEY=VALUE",
+        help="when did a value last change away from VALUE, KEY may end "
+        "in *, e.g. governor.governors.*=performance")
+    tune_parser = subparsers.add_parser(
+        "tune", help="plan, apply or revert fixes for the failed checks")
+    tune_action = tune_parser.add_mutually_exclusive_group()
+    tune_action.add_argument(
+        "--apply", action="store_true",
+        help="apply the plan, verify it and roll back on failure")
+    tune_action.add_argument(
+        "--revert", action="store_true",
+        help="restore the values recorded by the last --apply")
+    tune_parser.add_argument(
+        "--irq-cpus", metavar="CPULIST", type=parse_cpu_list,
+        help="also pin the sound card and USB IRQs to these CPUs")
+    tune_parser.add_argument(
+        "--journal", metavar="PATH",
+        help="where to record the previous values instead of "
+        "$XDG_STATE_HOME/rtcqs/tune.json")
+    bench_parser = subparsers.add_parser(
+        "bench", help="measure how this host performs")
+    bench_subparsers = bench_parser.add_subparsers(dest="bench")
+    bench_subparsers.required = True
+    latency_parser = bench_subparsers.add_parser(
+        "latency", help="measure SCHED_FIFO wakeup latency per CPU")
+    add_latency_arguments(latency_parser)
+    latency_parser.add_argument(
+        "--histogram", metavar="FILE",
+        help="write the per CPU latency histogram to FILE")
+    cstates_parser = bench_subparsers.add_parser(
+        "cstates", help="compare wakeup latency with and without holding "
+        "/dev/cpu_dma_latency")
+    add_latency_arguments(cstates_parser)
+    memory_parser = bench_subparsers.add_parser(
+        "memory", help="measure page faults and stalls with and without "
+        "mlockall")
+    memory_parser.add_argument(
+        "--size", type=int, default=256,
+        help="size of the probe buffer in MiB")
+    irq_rates_parser = bench_subparsers.add_parser(
+        "irqs", help="sample /proc/interrupts and find noisy IRQs")
+    irq_rates_parser.add_argument(
+        "--window", type=float, default=2.0,
+        help="sampling window in seconds")
+    irq_rates_parser.add_argument(
+        "--samples", type=int, default=2,
+        help="number of reads of /proc/interrupts in the window")
+    irq_rates_parser.add_argument(
+        "--threshold", type=float, default=1000.0,
+        help="interrupts per second above which an IRQ is reported")
+    clocks_parser = bench_subparsers.add_parser(
+        "clocks", help="measure the cost of reading each clock per CPU")
+    clocks_parser.add_argument(
+        "--cpus", type=parse_cpu_list,
+        help="CPUs to measure, e.g. 0-3,6 (default: all usable CPUs)")
+    clocks_parser.add_argument(
+        "--calls", type=int, default=100000,
+        help="number of reads per clock and CPU")
+    disks_parser = bench_subparsers.add_parser(
+        "disks", help="stream a temporary file on each audio capable mount "
+        "and measure read latency")
+    disks_parser.add_argument(
+        "--size", type=int, default=256,
+        help="size of the temporary file in MiB")
+    disks_parser.add_argument(
+        "--mounts", type=lambda mounts: mounts.split(","),
+        help="comma separated mount points, default all writable ext4, xfs, "
+        "zfs and btrfs mounts")
+    scan_parser = bench_subparsers.add_parser(
+        "scan", help="time every check against synthetic /proc and /sys "
+        "trees of growing size")
+    scan_parser.add_argument(
+        "--scales", type=check_list, default=["small", "medium", "large"],
+        help="comma separated scale points: small, medium, large")
+    scan_parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="runs per scale point, the fastest run is reported")
+    scan_parser.add_argument(
+        "-o", "--output", help="write the timings to a JSON file")
+    scan_parser.add_argument(
+        "--compare", metavar="BASELINE",
+        help="fail when a check is slower than in this JSON file")
+    scan_parser.add_argument(
+        "--threshold", type=float, default=1.25,
+        help="slowdown factor that counts as a regression")
+    startup_parser = bench_subparsers.add_parser(
+        "startup", help="measure how long rtcqs takes to start")
+    startup_parser.add_argument(
+        "--runs", type=int, default=10,
+        help="number of runs, the median is reported")
+    startup_parser.add_argument(
+        "--target", metavar="MS", type=float, default=50.0,
+        help="fail when rtcqs adds more than this to interpreter startup")
+    args = parser.parse_args()
+
+    from rtcqs.sysroot import open_sysroot, capture_snapshot
+
+    if args.command == "tune" and (args.apply or args.revert) \
+            and args.sysroot is not None:
+        parser.error("tune --apply and --revert change this host and can't "
+                     "be used with --sysroot")
+
+    if getattr(args, "cpus", None):
+        unusable = set(args.cpus) - os.sched_getaffinity(0)
+
+        if unusable:
+            parser.error(f"--cpus: CPUs {format_cpu_list(unusable)} are not "
+                         "online or not usable by this process")
+
+    if args.command == "snapshot":
+        capture_snapshot(args.output)
+        return
+    elif args.command == "bench" and args.bench == "latency":
+        from rtcqs.bench import run_latency
+        run_latency(args.cpus, args.frames, args.rate, args.duration,
+                    args.priority, args.format, args.histogram)
+        return
+    elif args.command == "bench" and args.bench == "cstates":
+        from rtcqs.bench import run_cstates
+        run_cstates(args.cpus, args.frames, args.rate, args.duration,
+                    args.priority, args.format)
+        return
+    elif args.command == "bench" and args.bench == "memory":
+        from rtcqs.bench import run_memory_probe
+        run_memory_probe(args.size, args.format)
+        return
+    elif args.command == "bench" and args.bench == "irqs":
+        from rtcqs.bench import run_irq_rates
+        run_irq_rates(open_sysroot(args.sysroot), args.window, args.samples,
+                      args.threshold, args.format)
+        return
+    elif args.command == "bench" and args.bench == "clocks":
+        from rtcqs.bench import run_clocks
+        run_clocks(args.cpus, args.calls, args.format)
+        return
+    elif args.command == "bench" and args.bench == "disks":
+        from rtcqs.bench import run_disks
+        run_disks(open_sysroot(args.sysroot), args.mounts, args.size,
+                  args.format)
+        return
+    elif args.command == "bench" and args.bench == "scan":
+        from rtcqs.bench import run_scan_bench
+        from rtcqs.fixtures import SCALES
+
+        unknown = set(args.scales) - set(SCALES)
+
+        if unknown:
+            parser.error(f"unknown scale(s): {', '.join(sorted(unknown))}")
+
+        if run_scan_bench(args.scales, args.repeat, args.format, args.output,
+                          args.compare, args.threshold):
+            sys.exit(1)
+        return
+    elif args.command == "bench" and args.bench == "startup":
+        from rtcqs.bench import run_startup
+
+        if run_startup(args.runs, args.target, args.format):
+            sys.exit(1)
+        return
+    elif args.command == "fleet":
+        from rtcqs.fleet import run_fleet
+        run_fleet(args.fleet_dir, args.output, args.fleet_jobs, args.jobs)
+        return
+
+    elif args.command == "history":
+        from rtcqs.history import HistoryStore, run_history
+
+        host = args.host or open_sysroot(args.sysroot).hostname()
+        run_history(HistoryStore(args.history_file), host, args.check,
+                    args.left, args.format)
+        return
+
+    elif args.command == "tune" and args.revert:
+        from rtcqs.tune import default_journal, revert
+
+        error = revert(open_sysroot(args.sysroot),
+                       args.journal or default_journal())
+
+        if error:
+            sys.stderr.write(f"rtcqs: {error}\n")
+            sys.exit(1)
+        return
+
+    try:
+        specs, shown = select(registry(Rtcqs), args.only, args.skip)
+    except ValueError as e:
+        parser.error(str(e))
+
+    app = Rtcqs(open_sysroot(args.sysroot))
+    app.use_cache = not args.no_cache
+    app.freq_window = args.freq_window
+    app.process_window = args.process_window
+    app.buffer_frames = args.buffer_size
+    app.sample_rate = args.sample_rate
+
+    if args.command == "watch":
+        from rtcqs.watch import Watcher
+
+        try:
+            Watcher(app, args.interval, args.format, specs, shown).run()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    app.output_format = args.format
+
+    if args.profile:
+        app.enable_profiling()
+
+    if args.command == "tune":
+        from rtcqs.tune import run_tune
+
+        app.gui_status = True
+        app.output_format = "text"
+        app.main(args.only, args.skip, args.jobs)
+
+        if not run_tune(app, args.apply, args.irq_cpus, args.journal,
+                        args.format):
+            sys.exit(1)
+        return
+
+    if args.command == "diff":
+        from rtcqs.history import HistoryStore, run_diff
+
+        app.gui_status = True
+        app.output_format = "text"
+        app.main(args.only, args.skip, args.jobs)
+        store = HistoryStore(args.history_file)
+        run_diff(app, store, args.baseline, args.format)
+    else:
+        app.main(args.only, args.skip, args.jobs)
+
+    if args.history:
+        from rtcqs.history import HistoryStore, Scan
+
+        HistoryStore(args.history_file).add(Scan.from_app(app), args.label)
 
 
 if __name__ == "__main__":
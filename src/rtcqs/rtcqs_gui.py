@@ -1,49 +1,100 @@
 #!/usr/bin/env python3
 
-import PySimpleGUI as sg
+import threading
 from rtcqs import Rtcqs, Resources
+from rtcqs.scheduler import registry
+
+sg = None
+
+
+def load_toolkit():
+    global sg
+
+    if sg is None:
+        import PySimpleGUI
+
+        sg = PySimpleGUI
+
+    return sg
 
 
 class RtcqsGUI:
     def __init__(self):
-        self.rtcqs = Rtcqs()
         self.res = Resources()
-        self.rtcqs.gui_status = True
-        self.version = self.rtcqs.version
-        self.element_vars = {}
-        self.element_vars["check_keys"] = []
-        self.tab_group_list = []
+        self.version = Rtcqs().version
+        self.titles = {spec.name: spec.title for spec in registry(Rtcqs)}
+        self.checks = list(self.titles)
+        self.window = None
+        self.worker = None
+        self.finished = set()
+
+    def run_analysis(self, window):
+        rtcqs = Rtcqs()
+        rtcqs.gui_status = True
+        rtcqs.result_hooks.append(
+            lambda result: window.write_event_value("-RESULT-", result))
+
+        error = None
 
-    def run_analysis(self):
         try:
-            self.rtcqs.main()
+            rtcqs.main()
         except BaseException as err:
             print(f"rtcqs exited with error {err=}, {type(err)=}")
+            error = err
+
+        window.write_event_value("-DONE-", error)
 
-        for check in self.rtcqs.output:
-            headline_key = f"{check}_headline"
-            img_key = f"{check}_img"
-            output_key = f"{check}_output"
-            tab_status = f"{check}_status"
+    def start_analysis(self):
+        self.finished.clear()
 
-            if self.rtcqs.status[check]:
-                self.element_vars[img_key] = self.res.ok_img
-                self.element_vars[tab_status] = "✔"
-            else:
-                self.element_vars[img_key] = self.res.warning_img
-                self.element_vars[tab_status] = "✘"
+        for check in self.checks:
+            self.window[f"{check}_tab"].update(
+                title=f"… {self.title(check)}")
+            self.window[f"{check}_img"].update(data=self.res.transparent_img)
+            self.window[f"{check}_output"].update(value="Checking…")
 
-            self.element_vars[headline_key] = self.rtcqs.headline[check]
-            self.element_vars[output_key] = self.rtcqs.output[check]
+        self.window["Rescan"].update(disabled=True)
+        self.worker = threading.Thread(
+            target=self.run_analysis, args=(self.window,), daemon=True)
+        self.worker.start()
 
-            self.element_vars["check_keys"].append(check)
+    def show_result(self, result):
+        check = result.id
+        self.finished.add(check)
+
+        if result.status == "ok":
+            img, mark = self.res.ok_img, "✔"
+        else:
+            img, mark = self.res.warning_img, "✘"
+
+        self.window[f"{check}_tab"].update(
+            title=f"{mark} {self.title(check)}")
+        self.window[f"{check}_img"].update(data=img)
+        self.window[f"{check}_output"].update(value=result.message)
+
+    def show_unfinished(self, error):
+        message = "The check did not finish"
+
+        if error is not None:
+            message += f", rtcqs failed with: {error}"
+
+        for check in self.checks:
+            if check not in self.finished:
+                self.window[f"{check}_tab"].update(
+                    title=f"✘ {self.title(check)}")
+                self.window[f"{check}_img"].update(
+                    data=self.res.warning_img)
+                self.window[f"{check}_output"].update(value=message)
+
+    def title(self, check):
+        return self.titles[check]
 
     def create_tab(self, tab_name, check):
         tab_layout = [
-            sg.Tab(f"{self.element_vars[f'{check}_status']}{tab_name}", [[
-                sg.Image(source=self.element_vars[f"{check}_img"],
+            sg.Tab(f"… {tab_name}", [[
+                sg.Image(source=self.res.transparent_img,
                          key=f"{check}_img"),
-                sg.Multiline(default_text=self.element_vars[f"{check}_output"],
+                sg.Multiline(default_text="Checking…",
                              size=(90, 4),
                              key=f"{check}_output",
                              disabled=True,
@@ -56,24 +107,15 @@ class RtcqsGUI:
         return tab_layout
 
     def create_tab_group(self):
-        tab_count = len(self.element_vars["check_keys"])
-        tab_group_count = 0
-        tab_row_count = 0
         tab_group_layout = []
 
-        for tab in range(tab_count):
-            if tab % 5 == 0:
-                tab_group_count += 1
-                tab_row_count += 5
-                tab_group_layout.append(
-                    [sg.TabGroup([
-                     self.create_tab(
-                        f"{self.element_vars[f'{check}_headline']}",
-                        check) for check in self.element_vars["check_keys"]
-                     ][tab:tab_row_count],
-                        key=f"tab_group{tab_group_count}",
-                        pad=(None, (0, 10)))]
-                )
+        for start in range(0, len(self.checks), 5):
+            tab_group_layout.append(
+                [sg.TabGroup([
+                    self.create_tab(self.title(check), check)
+                    for check in self.checks[start:start + 5]],
+                    key=f"tab_group{start // 5 + 1}",
+                    pad=(None, (0, 10)))])
 
         return tab_group_layout
 
@@ -82,6 +124,7 @@ class RtcqsGUI:
             self.create_tab_group(),
             [sg.Button(
                 button_text="About", size=(25, 1), pad=((5, 0), (0, 0))),
+             sg.Button(button_text="Rescan", size=(25, 1), disabled=True),
              sg.Stretch(), sg.Cancel(size=(25, 1), pad=((0, 5), (0, 0)))]]
 
         window_analysis = sg.Window(
@@ -114,9 +157,11 @@ class RtcqsGUI:
         return window_about
 
     def create_gui(self):
+        load_toolkit()
         sg.theme("SystemDefaultForReal")
 
-        self.make_analysis()
+        self.window = self.make_analysis()
+        self.start_analysis()
 
         while True:
             window, event, values = sg.read_all_windows()
@@ -124,6 +169,16 @@ class RtcqsGUI:
             if event in (sg.WIN_CLOSED, "Cancel"):
                 break
 
+            if event == "-RESULT-":
+                self.show_result(values[event])
+
+            if event == "-DONE-":
+                self.show_unfinished(values[event])
+                self.window["Rescan"].update(disabled=False)
+
+            if event == "Rescan":
+                self.start_analysis()
+
             if event == "About":
                 window_about = self.make_about()
 
@@ -131,7 +186,6 @@ class RtcqsGUI:
                 window_about.close()
 
     def main(self):
-        self.run_analysis()
         self.create_gui()
 
 
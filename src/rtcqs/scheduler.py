@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+
+class CheckSkipped(Exception):
+    def __init__(self, name, dependency):
+        super().__init__(
+            f"check '{name}' skipped, check '{dependency}' failed")
+        self.name = name
+        self.dependency = dependency
+
+
+class CheckSpec:
+    __slots__ = ("name", "title", "method", "produces", "consumes",
+                 "severity")
+
+    def __init__(self, name, title, method, produces=(), consumes=(),
+                 severity="medium"):
+        self.name = name
+        self.title = title
+        self.method = method
+        self.produces = tuple(produces)
+        self.consumes = tuple(consumes)
+        self.severity = severity
+
+
+def check(name, title, produces=(), consumes=(), severity="medium"):
+    def decorator(func):
+        func.check_spec = CheckSpec(
+            name, title, func.__name__, produces, consumes, severity)
+        return func
+
+    return decorator
+
+
+def registry(cls):
+    specs = {}
+
+    for klass in reversed(cls.__mro__):
+        for attr in vars(klass).values():
+            spec = getattr(attr, "check_spec", None)
+
+            if spec is not None:
+                specs[spec.name] = spec
+
+    return list(specs.values())
+
+
+def dependencies(specs):
+    producers = {}
+
+    for spec in specs:
+        for produced in spec.produces:
+            producers[produced] = spec.name
+
+    return {
+        spec.name: {
+            producers[consumed] for consumed in spec.consumes
+            if consumed in producers}
+        for spec in specs}
+
+
+def select(specs, only=None, skip=None):
+    names = [spec.name for spec in specs]
+    unknown = set(only or ()) | set(skip or ())
+    unknown.difference_update(names)
+
+    if unknown:
+        raise ValueError(f"unknown check(s): {', '.join(sorted(unknown))}")
+
+    wanted = [
+        name for name in names
+        if (not only or name in only) and name not in (skip or ())]
+    deps = dependencies(specs)
+    needed = set()
+    stack = list(wanted)
+
+    while stack:
+        name = stack.pop()
+
+        if name not in needed:
+            needed.add(name)
+            stack.extend(deps[name])
+
+    return [spec for spec in specs if spec.name in needed], set(wanted)
+
+
+class CheckScheduler:
+    def __init__(self, app, specs, shown=None, jobs=4, on_result=None,
+                 profiler=None):
+        self.app = app
+        self.specs = specs
+        self.shown = shown if shown is not None else {
+            spec.name for spec in specs}
+        self.jobs = jobs
+        self.on_result = on_result
+        self.profiler = profiler
+        self.deps = dependencies(specs)
+        self.lines = {}
+        self.done = set()
+        self.failed = {}
+        self.flushed = 0
+
+    def run_check(self, spec):
+        self.app.local.lines = lines = []
+
+        if self.profiler is None:
+            import contextlib
+
+            measure = contextlib.nullcontext()
+        else:
+            measure = self.profiler.measure(spec.name)
+
+        try:
+            with measure:
+                getattr(self.app, spec.method)()
+        finally:
+            self.app.local.lines = None
+
+        return lines
+
+    def flush(self):
+        while self.flushed < len(self.specs):
+            name = self.specs[self.flushed].name
+
+            if name not in self.done:
+                break
+
+            lines = self.lines.pop(name)
+
+            if name in self.shown:
+                self.app.write("".join(lines))
+
+            self.flushed += 1
+
+    def run(self):
+        import concurrent.futures
+
+        waiting = {name: set(deps) for name, deps in self.deps.items()}
+        specs = {spec.name: spec for spec in self.specs}
+        errors = []
+
+        with concurrent.futures.ThreadPoolExecutor(self.jobs) as executor:
+            running = {}
+
+            def skip_dependents(name):
+                for dependent in [dependent
+                                  for dependent, deps in waiting.items()
+                                  if name in deps]:
+                    del waiting[dependent]
+                    self.failed[dependent] = CheckSkipped(dependent, name)
+                    errors.append(self.failed[dependent])
+                    self.lines[dependent] = []
+                    self.done.add(dependent)
+                    skip_dependents(dependent)
+
+            def submit_ready():
+                for name in [name for name, deps in waiting.items()
+                             if not deps]:
+                    del waiting[name]
+                    running[executor.submit(
+                        self.run_check, specs[name])] = name
+
+            submit_ready()
+
+            while running:
+                finished, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for future in finished:
+                    name = running.pop(future)
+
+                    try:
+                        self.lines[name] = future.result()
+                    except Exception as e:
+                        errors.append(e)
+                        self.failed[name] = e
+                        self.lines[name] = []
+                        skip_dependents(name)
+                    else:
+                        if self.on_result and name in self.shown:
+                            self.on_result(specs[name])
+
+                    for deps in waiting.values():
+                        deps.discard(name)
+
+                    self.done.add(name)
+
+                submit_ready()
+                self.flush()
+
+        if errors:
+            raise errors[0]
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+
+import os
+import io
+import json
+import resource
+import posixpath
+
+FACTS_FILE = "rtcqs.json"
+
+SNAPSHOT_PATHS = [
+    "/proc/cmdline",
+    "/proc/config.gz",
+    "/proc/interrupts",
+    "/proc/mounts",
+    "/proc/self/mountinfo",
+    "/proc/swaps",
+    "/proc/sys/kernel/hostname",
+    "/proc/sys/kernel/osrelease",
+    "/proc/meminfo",
+    "/proc/sys/vm/swappiness",
+    "/proc/sys/vm/compaction_proactiveness",
+    "/proc/sys/vm/dirty_*",
+    "/sys/kernel/mm/transparent_hugepage/enabled",
+    "/sys/kernel/mm/transparent_hugepage/defrag",
+    "/sys/module/zswap/parameters/enabled",
+    "/sys/block/zram[0-9]*/disksize",
+    "/sys/block/*/dev",
+    "/sys/block/*/*/dev",
+    "/sys/block/*/queue/scheduler",
+    "/sys/block/*/queue/rotational",
+    "/sys/block/*/queue/nr_requests",
+    "/boot/config-{release}",
+    "/proc/asound/cards",
+    "/proc/asound/card[0-9]*/pcm[0-9]*[pc]/sub[0-9]*/info",
+    "/proc/asound/card[0-9]*/pcm[0-9]*[pc]/sub[0-9]*/hw_params",
+    "/proc/asound/card[0-9]*/pcm[0-9]*[pc]/sub[0-9]*/sw_params",
+    "/proc/asound/card[0-9]*/pcm[0-9]*[pc]/sub[0-9]*/status",
+    "/sys/bus/pci/devices/*/irq",
+    "/sys/bus/pci/devices/*/msi_irqs/*",
+    "/sys/devices/system/clocksource/clocksource0/current_clocksource",
+    "/sys/devices/system/clocksource/clocksource0/available_clocksource",
+    "/sys/devices/system/cpu/nohz_full",
+    "/sys/devices/system/cpu/isolated",
+    "/proc/irq/default_smp_affinity",
+    "/sys/devices/system/cpu/online",
+    "/sys/devices/system/cpu/smt/active",
+    "/sys/devices/system/cpu/cpufreq/policy[0-9]*/affected_cpus",
+    "/sys/devices/system/cpu/cpufreq/policy[0-9]*/scaling_governor",
+    "/sys/devices/system/cpu/cpufreq/policy[0-9]*/scaling_cur_freq",
+    "/sys/devices/system/cpu/cpufreq/policy[0-9]*/scaling_max_freq",
+    "/sys/devices/system/cpu/cpufreq/policy[0-9]*/"
+    "energy_performance_preference",
+    "/sys/devices/system/cpu/cpu[0-9]*/cpuidle/state[0-9]*/name",
+    "/sys/devices/system/cpu/cpu[0-9]*/cpuidle/state[0-9]*/latency",
+    "/sys/devices/system/cpu/cpu[0-9]*/cpuidle/state[0-9]*/residency",
+    "/sys/devices/system/cpu/cpu[0-9]*/cpuidle/state[0-9]*/disable",
+]
+
+
+class Sysroot:
+    def read_line(self, path, default=None):
+        try:
+            with self.open(path, "r") as f:
+                return f.readline().strip()
+        except OSError:
+            return default
+
+    def read_bytes(self, path):
+        with self.open(path, "rb") as f:
+            return f.read()
+
+
+class LiveSysroot(Sysroot):
+    name = "live"
+    cacheable = True
+
+    def open(self, path, mode="r"):
+        return open(path, mode)
+
+    def read_bytes(self, path):
+        fd = os.open(path, os.O_RDONLY)
+
+        try:
+            chunks = [os.read(fd, 65536)]
+
+            while chunks[-1]:
+                chunks.append(os.read(fd, 65536))
+
+            return b"".join(chunks)
+        finally:
+            os.close(fd)
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def isdir(self, path):
+        return os.path.isdir(path)
+
+    def listdir(self, path):
+        return os.listdir(path)
+
+    def access(self, path, mode):
+        return os.access(path, mode)
+
+    def user(self):
+        import getpass
+
+        return getpass.getuser()
+
+    def release(self):
+        return os.uname().release
+
+    def hostname(self):
+        return os.uname().nodename
+
+    def rlimit(self, limit):
+        return resource.getrlimit(getattr(resource, limit))[1]
+
+    def set_scheduler(self, policy, priority):
+        os.sched_setscheduler(0, policy, os.sched_param(priority))
+
+
+class SnapshotSysroot(Sysroot):
+    name = "snapshot"
+    cacheable = False
+
+    def __init__(self, path):
+        import tarfile
+
+        self.path = path
+        self.members = None
+
+        if os.path.isdir(path):
+            self.root = path
+        elif tarfile.is_tarfile(path):
+            self.root = None
+            self.load_tarball()
+        else:
+            raise ValueError(f"{path} is neither a directory nor a tarball")
+
+        try:
+            with self.open(f"/{FACTS_FILE}") as f:
+                self.facts = json.load(f)
+        except OSError:
+            self.facts = {}
+
+    def load_tarball(self):
+        import tarfile
+
+        self.members = {}
+        self.dirs = {"/": set()}
+
+        with tarfile.open(self.path, "r:*") as tar:
+            for member in tar:
+                name = posixpath.normpath(f"/{member.name}")
+
+                if member.isfile():
+                    self.members[name] = tar.extractfile(member).read()
+                elif member.isdir():
+                    self.dirs.setdefault(name, set())
+                else:
+                    continue
+
+                child = name
+
+                while child != "/":
+                    parent = posixpath.dirname(child)
+                    self.dirs.setdefault(parent, set()).add(
+                        posixpath.basename(child))
+                    child = parent
+
+    def host_path(self, path):
+        return os.path.join(self.root, path.lstrip("/"))
+
+    def open(self, path, mode="r"):
+        if self.members is None:
+            return open(self.host_path(path), mode)
+
+        path = posixpath.normpath(path)
+
+        if path not in self.members:
+            raise FileNotFoundError(2, "No such file in snapshot", path)
+        elif "b" in mode:
+            return io.BytesIO(self.members[path])
+        else:
+            return io.StringIO(self.members[path].decode())
+
+    def exists(self, path):
+        if self.members is None:
+            return os.path.exists(self.host_path(path))
+
+        path = posixpath.normpath(path)
+        return path in self.members or path in self.dirs
+
+    def isdir(self, path):
+        if self.members is None:
+            return os.path.isdir(self.host_path(path))
+
+        return posixpath.normpath(path) in self.dirs
+
+    def listdir(self, path):
+        if self.members is None:
+            return os.listdir(self.host_path(path))
+
+        path = posixpath.normpath(path)
+
+        if path not in self.dirs:
+            raise FileNotFoundError(2, "No such directory in snapshot", path)
+
+        return sorted(self.dirs[path])
+
+    def access(self, path, mode):
+        return self.facts.get("access", {}).get(path, False)
+
+    def user(self):
+        return self.facts.get("user", "unknown")
+
+    def release(self):
+        with self.open("/proc/sys/kernel/osrelease") as f:
+            return f.readline().strip()
+
+    def hostname(self):
+        return self.read_line("/proc/sys/kernel/hostname") or \
+            os.path.basename(self.path.rstrip("/"))
+
+    def rlimit(self, limit):
+        return self.facts.get("rlimits", {}).get(limit, 0)
+
+    def set_scheduler(self, policy, priority):
+        error = self.facts.get("rt_prio_error")
+
+        if error:
+            raise PermissionError(error)
+
+
+def open_sysroot(path=None):
+    if path is None:
+        return LiveSysroot()
+
+    return SnapshotSysroot(path)
+
+
+def capture_facts(sysroot):
+    facts = {
+        "user": sysroot.user(),
+        "rlimits": {
+            limit: sysroot.rlimit(limit)
+            for limit in ("RLIMIT_RTPRIO", "RLIMIT_MEMLOCK")},
+        "access": {
+            "/dev/cpu_dma_latency": sysroot.access(
+                "/dev/cpu_dma_latency", os.W_OK)},
+        "rt_prio_error": None,
+    }
+
+    try:
+        sysroot.set_scheduler(os.SCHED_FIFO, 80)
+    except PermissionError as e:
+        facts["rt_prio_error"] = str(e)
+    else:
+        os.sched_setscheduler(0, os.SCHED_OTHER, os.sched_param(0))
+
+    return facts
+
+
+def capture_snapshot(output):
+    import glob
+    import tarfile
+
+    sysroot = LiveSysroot()
+    release = sysroot.release()
+
+    with tarfile.open(output, "w:gz") as tar:
+        for pattern in SNAPSHOT_PATHS:
+            for path in sorted(glob.glob(pattern.format(release=release))):
+                try:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue
+
+                info = tarfile.TarInfo(path.lstrip("/"))
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+        data = json.dumps(capture_facts(sysroot)).encode()
+        info = tarfile.TarInfo(FACTS_FILE)
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+from rtcqs.cpulist import parse_cpu_list, format_cpu_list
+
+CPU_DIR = "/sys/devices/system/cpu"
+THP_DIR = "/sys/kernel/mm/transparent_hugepage"
+
+
+class Write:
+    __slots__ = ("check", "path", "value", "restore_path", "previous")
+
+    def __init__(self, check, path, value, restore_path=None, previous=None):
+        self.check = check
+        self.path = path
+        self.value = value
+        self.restore_path = restore_path or path
+        self.previous = previous
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def default_journal():
+    state_home = os.environ.get("XDG_STATE_HOME") or \
+        os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(state_home, "rtcqs", "tune.json")
+
+
+def read_setting(sysroot, path):
+    value = sysroot.read_line(path)
+
+    if value and "[" in value:
+        return value[value.index("[") + 1:value.index("]")]
+
+    return value
+
+
+def write_setting(sysroot, path, value):
+    with sysroot.open(path, "w") as f:
+        f.write(f"{value}\n")
+
+
+def plan_governor(app):
+    writes = []
+
+    for policy, info in app.values["governor"].get("policies", {}).items():
+        if info["governor"] == "performance":
+            continue
+
+        if policy.startswith("policy"):
+            path = f"{CPU_DIR}/cpufreq/{policy}/scaling_governor"
+        else:
+            path = f"{CPU_DIR}/{policy}/cpufreq/scaling_governor"
+
+        writes.append(Write("governor", path, "performance"))
+
+    return writes
+
+
+def plan_swappiness(app):
+    return [Write("swappiness", "/proc/sys/vm/swappiness", "10")]
+
+
+def plan_smt(app):
+    return [Write("smt", f"{CPU_DIR}/smt/control", "off")]
+
+
+def plan_memory(app):
+    values = app.values["memory"]
+    writes = []
+
+    for setting in ("enabled", "defrag"):
+        if values[f"thp_{setting}"] == "always":
+            writes.append(
+                Write("memory", f"{THP_DIR}/{setting}", "madvise"))
+
+    if values["dirty_limit"] is not None and values["dirty_limit"] > 2 << 30:
+        restore_path = None
+
+        if values["vm"]["dirty_bytes"] in (None, "0"):
+            restore_path = "/proc/sys/vm/dirty_ratio"
+
+        writes.append(Write("memory", "/proc/sys/vm/dirty_bytes",
+                            str(256 << 20), restore_path))
+
+    return writes
+
+
+def plan_cpu_idle(app):
+    writes = []
+
+    for state in app.values["cpu_idle"]["too_deep"]:
+        for cpu in parse_cpu_list(state["cpus"]):
+            idle_dir = f"{CPU_DIR}/cpu{cpu}/cpuidle"
+
+            for entry in sorted(app.sysroot.listdir(idle_dir)):
+                if entry.startswith("state") and app.sysroot.read_line(
+                        f"{idle_dir}/{entry}/name") == state["name"]:
+                    writes.append(Write(
+                        "cpu_idle", f"{idle_dir}/{entry}/disable", "1"))
+
+    return writes
+
+
+PLANNERS = {
+    "governor": plan_governor,
+    "cpu_idle": plan_cpu_idle,
+    "swappiness": plan_swappiness,
+    "memory": plan_memory,
+    "smt": plan_smt,
+}
+
+
+def plan_irq_affinity(app, cpus):
+    cpu_list = format_cpu_list(cpus)
+    irqs = sorted({
+        irq.irq for irq in
+        app.irq_inventory.sound() + app.irq_inventory.usb()})
+
+    return [
+        Write(None, f"/proc/irq/{irq}/smp_affinity_list", cpu_list)
+        for irq in irqs]
+
+
+def make_plan(app, irq_cpus=None):
+    writes = []
+
+    for check, planner in PLANNERS.items():
+        if check in app.status and not app.status[check]:
+            writes.extend(planner(app))
+
+    if irq_cpus and app.irq_inventory is not None:
+        writes.extend(plan_irq_affinity(app, irq_cpus))
+
+    for write in writes:
+        write.previous = read_setting(app.sysroot, write.restore_path)
+
+    return writes
+
+
+def rollback(sysroot, writes):
+    errors = []
+
+    for write in reversed(writes):
+        try:
+            write_setting(sysroot, write.restore_path, write.previous)
+        except OSError as e:
+            errors.append(f"{write.restore_path}: {e}")
+
+    return errors
+
+
+def verify(app, writes):
+    from rtcqs.rtcqs import Rtcqs
+
+    failed = [
+        write.path for write in writes
+        if read_setting(app.sysroot, write.path) != write.value]
+    checks = sorted({write.check for write in writes if write.check})
+    rescan = Rtcqs(app.sysroot)
+    rescan.gui_status = True
+    rescan.process_window = 0
+    rescan.buffer_frames = app.buffer_frames
+    rescan.sample_rate = app.sample_rate
+    rescan.main(only=checks, jobs=1)
+    failed += [check for check in checks if not rescan.status.get(check)]
+
+    return failed
+
+
+def apply_plan(app, writes, journal):
+    if app.sysroot.name != "live":
+        return "tune can only change this host, not a --sysroot snapshot"
+
+    if os.path.exists(journal):
+        return f"{journal} holds changes that were not reverted yet, run " \
+            "'rtcqs tune --revert' first"
+
+    missing = [write.restore_path for write in writes
+               if write.previous is None]
+
+    if missing:
+        return f"can't read {', '.join(missing)}"
+
+    os.makedirs(os.path.dirname(os.path.abspath(journal)), exist_ok=True)
+
+    with open(journal, "w") as f:
+        json.dump({"host": app.sysroot.hostname(), "time": time.time(),
+                   "writes": [write.as_dict() for write in writes]}, f,
+                  indent=2)
+
+    done = []
+    error = None
+
+    try:
+        for write in writes:
+            write_setting(app.sysroot, write.path, write.value)
+            done.append(write)
+    except OSError as e:
+        error = f"writing {write.path} failed: {e}"
+    else:
+        failed = verify(app, writes)
+
+        if failed:
+            error = f"verification failed for {', '.join(failed)}"
+
+    if error is None:
+        return None
+
+    errors = rollback(app.sysroot, done)
+
+    if errors:
+        return f"{error}, rolling back failed for {', '.join(errors)}, " \
+            f"the previous values are kept in {journal}"
+
+    os.remove(journal)
+    return f"{error}, all changes were rolled back"
+
+
+def revert(sysroot, journal):
+    if sysroot.name != "live":
+        return "tune can only change this host, not a --sysroot snapshot"
+
+    try:
+        with open(journal) as f:
+            writes = [Write(**write) for write in json.load(f)["writes"]]
+    except FileNotFoundError:
+        return f"no applied changes found in {journal}"
+
+    errors = rollback(sysroot, writes)
+
+    if errors:
+        return f"reverting failed for {', '.join(errors)}"
+
+    os.remove(journal)
+    return None
+
+
+def print_plan(writes, output_format="text"):
+    if output_format != "text":
+        print(json.dumps({"writes": [write.as_dict() for write in writes]}))
+    elif not writes:
+        print("Nothing to tune.")
+    else:
+        for write in writes:
+            previous = write.previous
+
+            if write.restore_path != write.path:
+                previous = f"{write.restore_path} = {previous}"
+
+            print(f"{write.check or 'irq_affinity'}: {write.path}: "
+                  f"{previous} -> {write.value}")
+
+
+def run_tune(app, apply=False, irq_cpus=None, journal=None,
+             output_format="text"):
+    journal = journal or default_journal()
+    writes = make_plan(app, irq_cpus)
+    print_plan(writes, output_format)
+
+    if not apply or not writes:
+        if writes and output_format == "text":
+            print("Dry run, use 'rtcqs tune --apply' to make these changes.")
+        return True
+
+    error = apply_plan(app, writes, journal)
+
+    if error:
+        sys.stderr.write(f"rtcqs: {error}\n")
+        return False
+
+    if output_format == "text":
+        print(f"Applied and verified {len(writes)} change(s), the previous "
+              f"values are kept in {journal} for 'rtcqs tune --revert'.")
+
+    return True
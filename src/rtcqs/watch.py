@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+import time
+from rtcqs.results import CheckResult, stable_values
+from rtcqs.scheduler import registry, dependencies, CheckScheduler
+
+CPU_DIR = "/sys/devices/system/cpu"
+
+
+class Watcher:
+    def __init__(self, app, interval=5.0, output_format="text", specs=None,
+                 shown=None):
+        self.app = app
+        self.app.gui_status = True
+        self.interval = interval
+        self.output_format = output_format
+        self.specs = specs if specs is not None else registry(type(app))
+        self.shown = shown
+        self.results = {}
+        self.digests = {}
+        self.sources = {
+            "governors": (self.read_governors, ["governor"]),
+            "smt": (self.read_files([f"{CPU_DIR}/smt/active"]), ["governor"]),
+            "irqs": (self.read_irqs, ["irqs"]),
+            "mounts": (self.read_files(["/proc/mounts"]), ["filesystems"]),
+            "swappiness": (self.read_files(
+                ["/proc/swaps", "/proc/sys/vm/swappiness"]), ["swappiness"]),
+            "streams": (self.read_streams, ["alsa"]),
+        }
+        names = {spec.name for spec in self.specs}
+        self.sources = {
+            source: (read, checks)
+            for source, (read, checks) in self.sources.items()
+            if names.intersection(checks)}
+        self.governor_online = None
+        self.governor_paths = None
+
+    def find_governor_paths(self):
+        policy_dir = f"{CPU_DIR}/cpufreq"
+
+        try:
+            policies = [
+                policy for policy in self.app.sysroot.listdir(policy_dir)
+                if policy.startswith("policy")]
+        except OSError:
+            return []
+
+        return [
+            f"{policy_dir}/{policy}/scaling_governor" for policy in policies]
+
+    def read_files(self, paths):
+        def read():
+            contents = []
+
+            for path in paths:
+                try:
+                    with self.app.sysroot.open(path, "r") as f:
+                        contents.append(f.read())
+                except OSError:
+                    contents.append(None)
+
+            return tuple(contents)
+
+        return read
+
+    def read_governors(self):
+        online = self.app.sysroot.read_line(f"{CPU_DIR}/online")
+
+        if self.governor_paths is None or online != self.governor_online:
+            self.governor_online = online
+            self.governor_paths = self.find_governor_paths()
+
+        return (online,) + self.read_files(self.governor_paths)()
+
+    def read_irqs(self):
+        try:
+            return tuple(sorted(
+                self.app.sysroot.listdir("/sys/kernel/irq"), key=int))
+        except (OSError, ValueError):
+            pass
+
+        layout = []
+
+        try:
+            with self.app.sysroot.open("/proc/interrupts", "r") as f:
+                cpu_count = len(f.readline().split())
+
+                for line in f:
+                    fields = line.split()
+                    layout.append(
+                        (fields[0], tuple(fields[cpu_count + 1:])))
+        except OSError:
+            return None
+
+        return tuple(layout)
+
+    def read_streams(self):
+        from rtcqs.alsa import read_cards, read_streams
+
+        return tuple(
+            (stream.card.number, stream.device, stream.direction,
+             stream.rate, stream.period_size, stream.buffer_size)
+            for stream in read_streams(
+                self.app.sysroot, read_cards(self.app.sysroot)))
+
+    def dependents(self, names):
+        deps = dependencies(self.specs)
+        affected = set(names)
+        changed = True
+
+        while changed:
+            changed = False
+
+            for name, needs in deps.items():
+                if name not in affected and needs & affected:
+                    affected.add(name)
+                    changed = True
+
+        return [spec for spec in self.specs if spec.name in affected]
+
+    def poll(self):
+        changed = set()
+
+        for source, (read, checks) in self.sources.items():
+            digest = read()
+
+            if self.digests.get(source, digest) != digest:
+                changed.update(checks)
+
+            self.digests[source] = digest
+
+        return changed
+
+    def on_result(self, spec):
+        result = CheckResult.from_app(self.app, spec)
+        previous = self.results.get(spec.name)
+        self.results[spec.name] = result
+
+        if previous is None:
+            self.emit("initial", result, None)
+        elif previous.status != result.status or \
+                stable_values(previous.values) != \
+                stable_values(result.values):
+            self.emit("changed", result, previous)
+
+    def emit(self, event, result, previous):
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+        if self.output_format == "text":
+            if previous is None:
+                transition = result.status
+            else:
+                transition = f"{previous.status} -> {result.status}"
+
+            sys.stdout.write(
+                f"{timestamp} {result.id}: {transition}: {result.message}\n")
+        else:
+            sys.stdout.write(json.dumps({
+                "time": timestamp,
+                "event": event,
+                "previous": previous.status if previous else None,
+                "result": result.as_dict()},
+                separators=(",", ":")) + "\n")
+
+        sys.stdout.flush()
+
+    def run_checks(self, specs):
+        try:
+            CheckScheduler(
+                self.app, specs, self.shown, jobs=1,
+                on_result=self.on_result).run()
+        except Exception as e:
+            sys.stderr.write(f"rtcqs: check failed: {e}\n")
+
+    def run(self, count=None):
+        self.poll()
+        self.run_checks(self.specs)
+
+        while count is None or count > 0:
+            time.sleep(self.interval)
+            changed = self.poll()
+
+            if changed:
+                self.run_checks(self.dependents(changed))
+
+            if count is not None:
+                count -= 1
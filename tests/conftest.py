@@ -0,0 +1,20 @@
+import pytest
+from rtcqs.fixtures import FixtureWriter, write_fixture
+from rtcqs.sysroot import SnapshotSysroot
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    root = tmp_path / "snapshot"
+    write_fixture(str(root), cpus=8)
+    return str(root)
+
+
+@pytest.fixture
+def writer(snapshot):
+    return FixtureWriter(snapshot)
+
+
+@pytest.fixture
+def sysroot(snapshot):
+    return SnapshotSysroot(snapshot)
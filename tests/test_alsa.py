@@ -0,0 +1,62 @@
+from rtcqs.alsa import Card, Stream, parse_cards, parse_params, read_params
+
+CARDS = """\
+ 0 [PCH            ]: HDA-Intel - HDA Intel PCH
+                      HDA Intel PCH at 0xf7f10000 irq 40
+ 1 [Scarlett2i2    ]: USB-Audio - Scarlett 2i2 USB
+                      Focusrite Scarlett 2i2 USB at usb-0000:00:14.0-2, high speed
+"""
+
+HW_PARAMS = """\
+access: MMAP_INTERLEAVED
+format: S32_LE
+subformat: STD
+channels: 2
+rate: 48000 (48000/1)
+period_size: 128
+buffer_size: 256
+"""
+
+
+def test_parse_cards():
+    pch, usb = parse_cards(CARDS)
+
+    assert (pch.number, pch.id, pch.driver, pch.name) == \
+        (0, "PCH", "HDA-Intel", "HDA Intel PCH")
+    assert pch.irq == 40
+    assert pch.usb_controller is None
+    assert (usb.number, usb.id, usb.driver) == \
+        (1, "Scarlett2i2", "USB-Audio")
+    assert usb.irq is None
+    assert usb.usb_controller == "0000:00:14.0"
+
+
+def test_parse_cards_without_cards():
+    assert parse_cards("--- no soundcards ---\n") == []
+
+
+def test_parse_params_and_stream():
+    hw_params = parse_params(HW_PARAMS)
+    status = parse_params("state: RUNNING\nowner_pid   : 1234\n")
+    stream = Stream(Card(0, "PCH", "HDA-Intel", "HDA Intel PCH"), 0, 0,
+                    "playback", hw_params, {"avail_min": "128"}, status)
+
+    assert hw_params["rate"] == "48000 (48000/1)"
+    assert status == {"state": "RUNNING", "owner_pid": "1234"}
+    assert stream.rate == 48000
+    assert stream.periods == 2
+    assert stream.owner_pid == 1234
+    assert round(stream.period_us) == 2667
+    assert stream.as_dict()["avail_min"] == 128
+
+
+def test_read_params_of_closed_streams(sysroot, writer):
+    sub_dir = "/proc/asound/card0/pcm0p/sub0"
+    writer.write(f"{sub_dir}/hw_params", "closed\n")
+    writer.write(f"{sub_dir}/sw_params", "no setup\n")
+    writer.write(f"{sub_dir}/status", "state: PREPARED\n")
+
+    assert read_params(sysroot, f"{sub_dir}/hw_params") is None
+    assert read_params(sysroot, f"{sub_dir}/sw_params") is None
+    assert read_params(sysroot, f"{sub_dir}/missing") is None
+    assert read_params(sysroot, f"{sub_dir}/status") == {"state": "PREPARED"}
@@ -0,0 +1,27 @@
+import pytest
+from rtcqs.cpulist import parse_cpu_list
+
+
+def test_single_cpus_and_ranges():
+    assert parse_cpu_list("0,2-4,7\n") == [0, 2, 3, 4, 7]
+
+
+def test_overlapping_parts_are_merged():
+    assert parse_cpu_list("0-3,2-5") == [0, 1, 2, 3, 4, 5]
+
+
+def test_stride_as_used_over_group():
+    assert parse_cpu_list("0-9:1/3") == [0, 3, 6, 9]
+
+
+def test_used_over_group():
+    assert parse_cpu_list("1-7:2/4") == [1, 2, 5, 6]
+    assert parse_cpu_list("0-4:2/4") == [0, 1, 4]
+    assert parse_cpu_list("0-3:4/4") == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("text", [
+    "3-1", "1-7:2", "1-7:5/4", "1-7:1/0", "x", "1-"])
+def test_malformed_lists_raise(text):
+    with pytest.raises(ValueError):
+        parse_cpu_list(text)
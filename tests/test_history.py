@@ -0,0 +1,87 @@
+import pytest
+from rtcqs.history import HistoryStore, Scan, flatten, key_range
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    yield store
+    store.close()
+
+
+def add_scan(store, scan_time, values, host="studio"):
+    status = "ok" if all(
+        value == "performance" for value in values.values()) else "warning"
+    return store.add(Scan(None, host, "6.8.0-rt", scan_time, None,
+                          {"governor": (status, values)}))
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    ("policy*", ("policy", "policz")),
+    ("cpu1.*", ("cpu1.", "cpu1/")),
+    ("*", ("", chr(0x10ffff))),
+    ("policy0", ("policy0", None)),
+])
+def test_key_range(pattern, expected):
+    assert key_range(pattern) == expected
+
+
+def test_prefix_range_excludes_longer_siblings():
+    start, end = key_range("cpu1.*")
+
+    assert start <= "cpu1.governor" < end
+    assert not start <= "cpu10.governor" < end
+
+
+def test_flatten():
+    assert dict(flatten({"a": {"b": [1, None]}, "c": "x", "d": True})) == {
+        "a.b.0": "1", "a.b.1": None, "c": "x", "d": "true"}
+
+
+def test_last_left_finds_most_recent_transition(store):
+    add_scan(store, 1, {"policy0": "performance", "policy1": "performance"})
+    add_scan(store, 2, {"policy0": "powersave", "policy1": "performance"})
+    add_scan(store, 3, {"policy0": "performance", "policy1": "performance"})
+    add_scan(store, 4, {"policy0": "performance", "policy1": "schedutil"})
+    add_scan(store, 5, {"policy0": "powersave", "policy1": "schedutil"})
+
+    assert store.last_left("studio", "governor", "policy*", "performance") \
+        == (4, [("policy1", "schedutil")])
+    assert store.last_left("studio", "governor", "policy0", "performance") \
+        == (5, [("policy0", "powersave")])
+    assert store.last_left("studio", "governor", "*", "performance") \
+        == (4, [("policy1", "schedutil")])
+
+
+def test_last_left_without_transition(store):
+    add_scan(store, 1, {"policy0": "powersave"})
+    add_scan(store, 2, {"policy0": "powersave"})
+    add_scan(store, 3, {"policy0": "performance"}, host="other")
+
+    assert store.last_left("studio", "governor", "policy*",
+                           "performance") is None
+    assert store.last_left("other", "governor", "policy*",
+                           "performance") is None
+    assert store.last_left("nowhere", "governor", "*", "performance") is None
+
+
+def test_last_left_ignores_keys_outside_prefix(store):
+    add_scan(store, 1, {"cpu1.governor": "performance",
+                        "cpu10.governor": "powersave"})
+    add_scan(store, 2, {"cpu1.governor": "powersave",
+                        "cpu10.governor": "powersave"})
+
+    assert store.last_left("studio", "governor", "cpu1.*", "performance") \
+        == (2, [("cpu1.governor", "powersave")])
+
+
+def test_find_returns_latest_scan(store):
+    add_scan(store, 1, {"policy0": "powersave"})
+    add_scan(store, 2, {"policy0": "performance"})
+    store.add(Scan(None, "studio", "6.8.0-rt", 0, None,
+                   {"governor": ("ok", {})}), "baseline")
+
+    assert store.find("studio").results == {
+        "governor": ("ok", {"policy0": "performance"})}
+    assert store.find("studio", "baseline").time == 0
+    assert store.find("other") is None
@@ -0,0 +1,109 @@
+import os
+from rtcqs.fixtures import irq_description
+from rtcqs.irqs import InterruptSample, Irq, IrqInventory
+
+INTERRUPTS = """\
+           CPU0       CPU1       CPU2
+  0:         31          0          0  IO-APIC    2-edge      timer
+ 16:          0       4096          7  IO-APIC   16-fasteoi   ehci_hcd:usb1, i801_smbus
+NMI:          1          2          3   Non-maskable interrupts
+ERR:          0
+MIS:          0
+"""
+
+
+def test_parse_skips_short_rows():
+    sample = InterruptSample.parse(INTERRUPTS, 12.5)
+
+    assert sample.time == 12.5
+    assert sample.cpus == [0, 1, 2]
+    assert sample.labels == ["0", "16", "NMI"]
+    assert sample.descriptions[1] == \
+        "IO-APIC   16-fasteoi   ehci_hcd:usb1, i801_smbus"
+    assert list(sample.row(1)) == [0, 4096, 7]
+    assert list(sample.row(2)) == [1, 2, 3]
+
+
+def test_parse_fixture(sysroot):
+    sample = InterruptSample.read(sysroot)
+
+    assert sample.cpus == list(range(8))
+    assert len(sample.labels) == 55
+    assert sample.labels[-5:] == ["NMI", "LOC", "RES", "CAL", "TLB"]
+    assert sample.descriptions[40] == irq_description(40)
+    assert list(sample.row(40)) == [16760, 0, 0, 0, 0, 40405, 0, 0]
+
+
+def test_deltas_align_by_label():
+    previous = InterruptSample.parse(INTERRUPTS)
+    current = InterruptSample.parse("""\
+           CPU0       CPU1       CPU2
+ 16:          3       4100          7  IO-APIC   16-fasteoi   ehci_hcd:usb1
+  0:         30          5          0  IO-APIC    2-edge      timer
+ 17:          9          9          9  IO-APIC   17-fasteoi   new
+""")
+
+    assert list(current.deltas(previous)) == [3, 4, 0, 0, 5, 0, 9, 9, 9]
+
+
+def test_description_with_edge_trigger_suffix():
+    irq = Irq.from_description(40, irq_description(40), (1, 0))
+
+    assert irq.chip == "IR-PCI-MSI"
+    assert irq.hwirq == "514048-edge"
+    assert irq.actions == ("snd_hda_intel:card0",)
+    assert not irq.shared
+
+
+def test_description_with_level_and_edge_words():
+    level = Irq.from_description(11, "GICv3  27 Level     arch_timer", ())
+    edge = Irq.from_description(
+        12, "GICv3 116 Edge      eth0, eth0-rx", ())
+
+    assert (level.chip, level.hwirq, level.actions) == \
+        ("GICv3", "27 Level", ("arch_timer",))
+    assert (edge.hwirq, edge.actions) == ("116 Edge", ("eth0", "eth0-rx"))
+    assert edge.shared
+    assert edge.devices == "eth0, eth0-rx"
+
+
+def test_description_without_hwirq():
+    irq = Irq.from_description(7, "dummy-chip  dummy_device", ())
+    empty = Irq.from_description(8, "", ())
+
+    assert (irq.chip, irq.hwirq, irq.actions) == \
+        ("dummy-chip", None, ("dummy_device",))
+    assert (empty.chip, empty.hwirq, empty.actions) == (None, None, ())
+
+
+def test_inventory_from_fixture(sysroot):
+    inventory = IrqInventory.read(sysroot)
+
+    assert len(inventory.irqs) == 50
+    assert [irq.irq for irq in inventory.sound()] == [40]
+    assert [irq.irq for irq in inventory.usb()] == [13, 41]
+    assert inventory.irqs[13].actions == ("ehci_hcd:usb1", "i801_smbus")
+    assert inventory.serving_cpus(40) == [0, 5]
+
+
+def test_inventory_sysfs_fallback(sysroot, writer, snapshot):
+    os.remove(os.path.join(snapshot, "proc", "interrupts"))
+
+    for irq, chip, hwirq, actions in (
+            (9, "IO-APIC", "9", "acpi"),
+            (16, "IO-APIC", "16", "ehci_hcd:usb1,i801_smbus"),
+            (130, "IR-PCI-MSI-0000:00:1f.3", "0", "snd_hda_intel:card0"),
+            (131, "PCI-MSI", "1", "")):
+        writer.write(f"/sys/kernel/irq/{irq}/chip_name", f"{chip}\n")
+        writer.write(f"/sys/kernel/irq/{irq}/hwirq", f"{hwirq}\n")
+        writer.write(f"/sys/kernel/irq/{irq}/actions", f"{actions}\n")
+
+    inventory = IrqInventory.read(sysroot)
+
+    assert inventory.cpus == []
+    assert list(inventory.irqs) == [9, 16, 130, 131]
+    assert inventory.irqs[16].actions == ("ehci_hcd:usb1", "i801_smbus")
+    assert inventory.irqs[16].shared
+    assert inventory.irqs[131].actions == ()
+    assert [irq.irq for irq in inventory.sound()] == [130]
+    assert [irq.irq for irq in inventory.usb()] == [16]
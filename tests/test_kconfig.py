@@ -0,0 +1,84 @@
+import gzip
+import os
+from rtcqs.fixtures import RELEASE
+from rtcqs.kconfig import KernelConfig, KernelConfigCache
+
+
+def test_parse_values_and_unset_symbols():
+    config = KernelConfig.parse([
+        "CONFIG_HZ=1000\n",
+        "CONFIG_PREEMPT_RT=y\n",
+        "CONFIG_SND_USB_AUDIO=m\n",
+        'CONFIG_DEFAULT_HOSTNAME="(none)"\n',
+        "# CONFIG_PREEMPT_NONE is not set\n",
+        "# a comment that is no symbol\n",
+        "CONFIG_BROKEN\n",
+    ])
+
+    assert config.value("CONFIG_HZ") == config.value("HZ") == "1000"
+    assert config.value("DEFAULT_HOSTNAME") == "(none)"
+    assert config.is_builtin("PREEMPT_RT")
+    assert config.is_enabled("SND_USB_AUDIO")
+    assert not config.is_builtin("SND_USB_AUDIO")
+    assert config.value("PREEMPT_NONE") == "n"
+    assert not config.is_enabled("PREEMPT_NONE")
+    assert "PREEMPT_NONE" in config
+    assert "BROKEN" not in config
+    assert len(config) == 5
+
+
+def test_empty_config_is_false():
+    assert not KernelConfig.parse([])
+
+
+def test_from_compressed_fixture(sysroot):
+    with sysroot.open("/proc/config.gz", "rb") as f:
+        config = KernelConfig.from_file(f, compressed=True)
+
+    assert config.is_builtin("CONFIG_PREEMPT_RT")
+    assert config.value("CONFIG_SYNTHETIC_0") == "n"
+    assert config.value("CONFIG_SYNTHETIC_1") == "m"
+    assert config.value("CONFIG_SYNTHETIC_2") == "y"
+    assert len(config) == 306
+
+
+def test_cache_round_trip(tmp_path, snapshot):
+    config_path = os.path.join(snapshot, "proc", "config.gz")
+    cache = KernelConfigCache(str(tmp_path / "cache"))
+    opened = []
+
+    def opener(path, mode):
+        opened.append(path)
+        return open(path, mode)
+
+    first = cache.load(RELEASE, config_path, True, opener)
+    assert os.path.exists(cache.path(RELEASE))
+    assert opened[-1] == config_path
+
+    opened.clear()
+    second = cache.load(RELEASE, config_path, True, opener)
+
+    assert opened == [cache.path(RELEASE)]
+    assert second.symbols == first.symbols
+
+
+def test_cache_misses_after_config_change(tmp_path):
+    config_path = tmp_path / "config"
+    config_path.write_text("CONFIG_HZ=250\n")
+    cache = KernelConfigCache(str(tmp_path / "cache"))
+    assert cache.load("test", str(config_path)).value("HZ") == "250"
+
+    config_path.write_text("CONFIG_HZ=1000\n# CONFIG_X is not set\n")
+    assert cache.load("test", str(config_path)).value("HZ") == "1000"
+
+
+def test_corrupt_cache_is_ignored(tmp_path):
+    config_path = tmp_path / "config.gz"
+    config_path.write_bytes(gzip.compress(b"CONFIG_HZ=300\n"))
+    cache = KernelConfigCache(str(tmp_path / "cache"))
+    os.makedirs(cache.cache_dir)
+
+    with open(cache.path("test"), "wb") as f:
+        f.write(b"not marshal data")
+
+    assert cache.load("test", str(config_path), True).value("HZ") == "300"
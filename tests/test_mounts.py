@@ -0,0 +1,53 @@
+import os
+from rtcqs.mounts import parse_mountinfo, parse_mounts, read_mounts
+
+
+def test_parse_mountinfo_unescapes_and_merges_options():
+    mounts = parse_mountinfo(
+        "36 35 98:0 /mnt1 /mnt/audio\\040projects rw,noatime master:1 - "
+        "ext3 /dev/root rw,errors=continue\n"
+        "garbage without a separator\n"
+        "40 35 0:22 / /run rw shared:5 - tmpfs tmpfs\n")
+
+    assert len(mounts) == 2
+    assert mounts[0].mount_point == "/mnt/audio projects"
+    assert mounts[0].fstype == "ext3"
+    assert mounts[0].source == "/dev/root"
+    assert mounts[0].options >= {"rw", "noatime", "errors=continue"}
+    assert mounts[0].dev == "98:0"
+    assert mounts[1].fstype == "tmpfs"
+    assert mounts[1].device is None
+
+
+def test_parse_mounts():
+    mounts = parse_mounts(
+        "/dev/sda1 / ext4 rw,relatime 0 0\n"
+        "//nas/audio\\040files /mnt/nas cifs ro,noatime 0 0\n"
+        "short line\n")
+
+    assert [mount.mount_point for mount in mounts] == ["/", "/mnt/nas"]
+    assert mounts[1].source == "//nas/audio files"
+    assert mounts[1].options == {"ro", "noatime"}
+    assert mounts[1].dev is None
+
+
+def test_read_mounts_maps_block_devices(sysroot):
+    mounts = read_mounts(sysroot)
+
+    assert len(mounts) == 10
+    root = mounts[0]
+    assert (root.mount_point, root.fstype, root.dev) == ("/", "ext4", "8:1")
+    assert root.device.name == "sda"
+    assert root.device.scheduler == "none"
+    assert root.device.kind == "SSD"
+    assert root.device.nr_requests == 256
+    assert all(mount.device is root.device for mount in mounts)
+
+
+def test_read_mounts_falls_back_to_proc_mounts(sysroot, snapshot):
+    os.remove(os.path.join(snapshot, "proc", "self", "mountinfo"))
+    mounts = read_mounts(sysroot)
+
+    assert len(mounts) == 10
+    assert mounts[1].mount_point == "/srv/vol1"
+    assert all(mount.device is None for mount in mounts)
@@ -0,0 +1,51 @@
+from rtcqs.fixtures import task_stat
+from rtcqs.procfs import TaskStat, iter_processes, iter_threads, read_stat
+
+
+def test_comm_with_parentheses_and_spaces():
+    stat = TaskStat(task_stat(4242, "Web Content) (x", 1, 3, utime=77))
+
+    assert stat.pid == 4242
+    assert stat.comm == "Web Content) (x"
+    assert stat.state == "S"
+    assert stat.ppid == 1
+    assert stat.utime == 77
+    assert stat.num_threads == 3
+    assert stat.processor == 2
+    assert stat.policy_name == "SCHED_OTHER"
+    assert not stat.realtime
+
+
+def test_realtime_policy():
+    stat = TaskStat(task_stat(57, "irq/40-snd_hda_", 2, policy=1,
+                              priority=50))
+
+    assert stat.rt_priority == 50
+    assert stat.policy_name == "SCHED_FIFO"
+    assert stat.realtime
+    assert TaskStat(task_stat(1, "batch", 0, policy=3)).policy_name == \
+        "SCHED_BATCH"
+    assert TaskStat(task_stat(1, "odd", 0, policy=4)).policy_name == "4"
+
+
+def test_read_stat_rejects_bad_data(sysroot, writer):
+    writer.write("/proc/99999/stat", "99999 (truncated) S 1\n")
+
+    assert read_stat(sysroot, "/proc/99999/stat") is None
+    assert read_stat(sysroot, "/proc/99998/stat") is None
+
+
+def test_iter_processes_and_threads(sysroot):
+    processes = {stat.pid: stat for stat in iter_processes(sysroot)}
+
+    assert len(processes) == 100
+    assert processes[1040].comm == "irq/40-snd_hda_"
+    assert processes[1040].realtime
+
+    threads = list(iter_threads(sysroot, processes))
+    workers = [(pid, stat.pid) for pid, stat in threads
+               if stat.comm.endswith(":w")]
+
+    assert len(threads) == 100 + 13 * 7
+    assert len(workers) == 13 * 7
+    assert (1050, 1051) in workers
@@ -0,0 +1,84 @@
+import os
+from rtcqs.rtcqs import Rtcqs
+from rtcqs.sysroot import SnapshotSysroot
+from rtcqs.tune import Write, make_plan, read_setting, rollback
+
+CPU_DIR = "/sys/devices/system/cpu"
+
+
+def scan(snapshot):
+    app = Rtcqs(SnapshotSysroot(snapshot))
+    app.gui_status = True
+    app.main(jobs=1)
+    return app
+
+
+def test_make_plan(snapshot):
+    writes = make_plan(scan(snapshot), irq_cpus=[2, 3])
+    plan = {write.path: write for write in writes}
+
+    governor = plan[f"{CPU_DIR}/cpufreq/policy7/scaling_governor"]
+    assert (governor.check, governor.value, governor.previous) == \
+        ("governor", "performance", "powersave")
+    assert not any(
+        write.path.endswith("scaling_governor") and write is not governor
+        for write in writes)
+
+    dirty = plan["/proc/sys/vm/dirty_bytes"]
+    assert (dirty.value, dirty.restore_path, dirty.previous) == \
+        ("268435456", "/proc/sys/vm/dirty_ratio", "20")
+
+    smt = plan[f"{CPU_DIR}/smt/control"]
+    assert (smt.value, smt.previous) == ("off", None)
+
+    affinity = [write for write in writes if write.check is None]
+    assert [(write.path, write.value, write.previous)
+            for write in affinity] == [
+        ("/proc/irq/13/smp_affinity_list", "2-3", "5"),
+        ("/proc/irq/40/smp_affinity_list", "2-3", "0"),
+        ("/proc/irq/41/smp_affinity_list", "2-3", "1"),
+    ]
+    assert writes[-3:] == affinity
+
+
+def test_make_plan_reads_bracketed_settings(snapshot, writer):
+    writer.write("/sys/kernel/mm/transparent_hugepage/enabled",
+                 "[always] madvise never\n")
+    writes = make_plan(scan(snapshot))
+    thp = [write for write in writes if "transparent_hugepage" in write.path]
+
+    assert [(write.path.rsplit("/", 1)[1], write.value, write.previous)
+            for write in thp] == [("enabled", "madvise", "always")]
+    assert not any(write.check is None for write in writes)
+
+
+def test_rollback_restores_in_reverse_order(sysroot, writer):
+    writer.write("/proc/sys/vm/dirty_ratio", "0\n")
+    writer.write("/proc/sys/vm/dirty_bytes", "268435456\n")
+    writer.write("/proc/sys/vm/swappiness", "10\n")
+    writes = [
+        Write("memory", "/proc/sys/vm/swappiness", "10", previous="60"),
+        Write("memory", "/proc/sys/vm/dirty_bytes", "268435456",
+              "/proc/sys/vm/dirty_ratio", "20"),
+        Write("memory", "/proc/sys/vm/swappiness", "5", previous="10"),
+    ]
+
+    assert rollback(sysroot, writes) == []
+    assert read_setting(sysroot, "/proc/sys/vm/swappiness") == "60"
+    assert read_setting(sysroot, "/proc/sys/vm/dirty_ratio") == "20"
+    assert read_setting(sysroot, "/proc/sys/vm/dirty_bytes") == "268435456"
+
+
+def test_rollback_reports_errors_and_continues(sysroot, snapshot):
+    missing = "/sys/missing/knob"
+    writes = [
+        Write("swappiness", "/proc/sys/vm/swappiness", "10", previous="60"),
+        Write("smt", missing, "off", previous="on"),
+    ]
+
+    errors = rollback(sysroot, writes)
+
+    assert len(errors) == 1
+    assert errors[0].startswith(f"{missing}: ")
+    assert not os.path.exists(os.path.join(snapshot, "sys", "missing"))
+    assert read_setting(sysroot, "/proc/sys/vm/swappiness") == "60"